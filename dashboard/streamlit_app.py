@@ -4,26 +4,25 @@ A Streamlit web interface for monitoring and controlling carbon-aware ML trainin
 """
 
 import streamlit as st
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
-import pandas as pd
-import time
-import threading
-from datetime import datetime, timedelta
+import numpy as np
+from datetime import datetime
+from collections import deque
 import json
-from typing import Dict, List
+from typing import Dict
 
 # Local imports
 import sys
 import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
 
-from utils.energy_monitor import EnergyMonitor, EnergyTracker
+# Plotting, pandas and model training are imported where they are first
+# needed, so a rerun that doesn't draw charts or train doesn't pay for them.
+from utils.energy_monitor import EnergyMonitor
 from utils.carbon_calculator import CarbonCalculator, CarbonAwareTrainingSession
 from data_pipeline.carbon_intensity import get_carbon_intensity, load_config
 from scheduler.scheduler import schedule_training
-from utils.logger import get_logger
 
 # Configure page
 st.set_page_config(
@@ -38,8 +37,19 @@ if 'energy_monitor' not in st.session_state:
     st.session_state.energy_monitor = None
 if 'monitoring_active' not in st.session_state:
     st.session_state.monitoring_active = False
-if 'training_history' not in st.session_state:
-    st.session_state.training_history = []
+if 'ci_trend' not in st.session_state:
+    st.session_state.ci_trend = deque(maxlen=60)
+
+# Session history is stored column-wise, one NumPy array per field
+HISTORY_FIELDS = {
+    'timestamp': 'datetime64[ms]',
+    'duration_hours': 'f8',
+    'energy_kwh': 'f8',
+    'co2_kg': 'f8',
+    'avg_power_watts': 'f8'
+}
+if 'history' not in st.session_state:
+    st.session_state.history = {name: np.empty(0, dtype=dtype) for name, dtype in HISTORY_FIELDS.items()}
 
 # Initialize components
 @st.cache_resource
@@ -47,13 +57,151 @@ def get_carbon_calculator():
     """Get cached carbon calculator instance."""
     return CarbonCalculator()
 
+@st.cache_data(ttl=300)
+def get_config():
+    """Get configuration, cached across reruns."""
+    return load_config()
+
+@st.cache_data(ttl=300)
 def get_current_carbon_intensity():
     """Get current carbon intensity with caching."""
     return get_carbon_intensity()
 
-def get_training_recommendation():
-    """Get current training recommendation."""
-    return schedule_training()
+@st.cache_data(ttl=60)
+def get_training_recommendation(ci=None):
+    """Get current training recommendation, reusing an already fetched carbon intensity."""
+    return schedule_training(ci=ci)
+
+def record_training_session(session: Dict):
+    """Append a finished session to the columnar history."""
+    history = st.session_state.history
+    for name, dtype in HISTORY_FIELDS.items():
+        history[name] = np.append(history[name], np.array([session[name]], dtype=dtype))
+
+@st.cache_data
+def history_table(history: Dict):
+    """Materialize the history columns as a DataFrame for display."""
+    import pandas as pd
+    
+    return pd.DataFrame(history)
+
+# Upper bound on points sent to the browser per line chart
+MAX_CHART_POINTS = 500
+
+def downsample_series(x, y, max_points: int = MAX_CHART_POINTS):
+    """
+    Reduce a time series to at most max_points using Largest-Triangle-Three-Buckets.
+    
+    LTTB keeps the points that preserve the visual shape of the line, so long
+    histories render quickly without flattening peaks.
+    
+    Args:
+        x: Timestamps (datetime-like) of the series
+        y: Values of the series
+        max_points: Maximum number of points to keep
+        
+    Returns:
+        (x, y) lists containing the selected points
+    """
+    x = list(x)
+    y_arr = np.asarray(y, dtype=np.float64)
+    n = len(y_arr)
+    if n <= max_points or max_points < 3:
+        return x, list(y)
+    
+    x_arr = np.asarray(x, dtype='datetime64[ns]').astype(np.int64).astype(np.float64)
+    bucket_size = (n - 2) / (max_points - 2)
+    selected = [0]
+    a = 0
+    for i in range(max_points - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        avg_x = x_arr[end:next_end].mean()
+        avg_y = y_arr[end:next_end].mean()
+        # Pick the point forming the largest triangle with the previous pick and the next bucket's mean
+        area = np.abs((x_arr[a] - avg_x) * (y_arr[start:end] - y_arr[a])
+                      - (x_arr[a] - x_arr[start:end]) * (avg_y - y_arr[a]))
+        a = start + int(area.argmax())
+        selected.append(a)
+    selected.append(n - 1)
+    return [x[i] for i in selected], y_arr[selected].tolist()
+
+def get_figure(name: str, build):
+    """
+    Get this session's persistent figure, building it on first use.
+    
+    Figures are kept in session state so reruns only replace trace data
+    instead of rebuilding layouts, and are rendered with a stable key so
+    Streamlit reuses the chart component.
+    """
+    if 'figures' not in st.session_state:
+        st.session_state.figures = {}
+    if name not in st.session_state.figures:
+        st.session_state.figures[name] = build()
+    return st.session_state.figures[name]
+
+def build_ci_figure():
+    """Carbon intensity trend with optimal/max threshold lines."""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(mode='lines+markers', name='Carbon Intensity'))
+    fig.add_hline(y=0, line_dash="dash", line_color="green", 
+                  annotation_text="Optimal Threshold")
+    fig.add_hline(y=0, line_dash="dash", line_color="red", 
+                  annotation_text="Max Threshold")
+    fig.update_layout(
+        xaxis_title="Time",
+        yaxis_title="gCO2eq/kWh",
+        height=300,
+        showlegend=False
+    )
+    return fig
+
+def build_energy_figure():
+    """Current power breakdown by component."""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=['CPU', 'GPU', 'Total'],
+        marker_color=['lightblue', 'lightgreen', 'lightcoral']
+    ))
+    fig.update_layout(
+        xaxis_title="Component",
+        yaxis_title="Power (Watts)",
+        height=300,
+        showlegend=False
+    )
+    return fig
+
+def build_history_figure():
+    """CO2 emissions per recorded session."""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(mode='lines+markers', name='CO2 Emissions (kg)'))
+    fig.update_layout(
+        xaxis_title="Time",
+        yaxis_title="CO2 Emissions (kg)",
+        height=300
+    )
+    return fig
+
+def build_scatter_figure():
+    """Energy consumption vs. emissions, sized by session duration."""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    # WebGL rendering keeps the scatter responsive as history grows
+    fig.add_trace(go.Scattergl(mode='markers', marker=dict(opacity=0.6)))
+    fig.update_layout(
+        xaxis_title="Energy Consumption (kWh)",
+        yaxis_title="CO2 Emissions (kg)",
+        height=300
+    )
+    return fig
 
 # Sidebar Configuration
 st.sidebar.title("🌱 Carbon-Aware ML")
@@ -61,7 +209,7 @@ st.sidebar.markdown("---")
 
 # Configuration section
 st.sidebar.subheader("⚙️ Configuration")
-config = load_config()
+config = get_config()
 
 # Carbon intensity settings
 st.sidebar.markdown("**Carbon Intensity Thresholds**")
@@ -93,149 +241,134 @@ refresh_interval = st.sidebar.slider("Refresh Interval (seconds)", 5, 60, 10)
 st.title("🌱 Carbon-Aware Machine Learning Dashboard")
 st.markdown("Monitor and control your ML training with real-time carbon footprint awareness")
 
-# Real-time metrics row
-col1, col2, col3, col4 = st.columns(4)
-
-# Get current metrics
-current_ci = get_current_carbon_intensity()
-training_ok = get_training_recommendation()
-current_time = datetime.now()
-
-with col1:
-    if current_ci is not None:
-        # Color code based on thresholds
-        if current_ci < min_ci:
-            ci_color = "🟢"
-            ci_status = "Optimal"
-        elif current_ci < max_ci:
-            ci_color = "🟡"
-            ci_status = "Acceptable"
-        else:
-            ci_color = "🔴"
-            ci_status = "High"
+# Live sections re-run on their own timer instead of re-executing the whole script
+live_refresh = refresh_interval if auto_refresh else None
+
+@st.fragment(run_every=live_refresh)
+def live_metrics():
+    """Real-time metrics row."""
+    col1, col2, col3, col4 = st.columns(4)
+
+    # Get current metrics
+    current_ci = get_current_carbon_intensity()
+    training_ok = get_training_recommendation(current_ci)
+    current_time = datetime.now()
+
+    with col1:
+        if current_ci is not None:
+            # Color code based on thresholds
+            if current_ci < min_ci:
+                ci_color = "🟢"
+                ci_status = "Optimal"
+            elif current_ci < max_ci:
+                ci_color = "🟡"
+                ci_status = "Acceptable"
+            else:
+                ci_color = "🔴"
+                ci_status = "High"
         
+            st.metric(
+                label=f"{ci_color} Carbon Intensity",
+                value=f"{current_ci:.0f} gCO2eq/kWh",
+                help=f"Status: {ci_status}"
+            )
+        else:
+            st.metric(
+                label="⚪ Carbon Intensity",
+                value="N/A",
+                help="Unable to fetch current data"
+            )
+
+    with col2:
+        training_status = "✅ Go" if training_ok else "⏸️ Wait"
         st.metric(
-            label=f"{ci_color} Carbon Intensity",
-            value=f"{current_ci:.0f} gCO2eq/kWh",
-            help=f"Status: {ci_status}"
+            label="Training Recommendation",
+            value=training_status,
+            help="Based on carbon intensity and time window"
         )
-    else:
+
+    with col3:
+        current_hour = current_time.hour
+        in_window = earliest_hour <= current_hour <= latest_hour
+        window_status = "✅ Open" if in_window else "🔒 Closed"
         st.metric(
-            label="⚪ Carbon Intensity",
-            value="N/A",
-            help="Unable to fetch current data"
+            label="Time Window",
+            value=window_status,
+            help=f"Current hour: {current_hour}, Window: {earliest_hour}-{latest_hour}"
         )
 
-with col2:
-    training_status = "✅ Go" if training_ok else "⏸️ Wait"
-    training_color = "normal" if training_ok else "inverse"
-    st.metric(
-        label="Training Recommendation",
-        value=training_status,
-        help="Based on carbon intensity and time window"
-    )
+    with col4:
+        # Energy monitoring status
+        if st.session_state.monitoring_active:
+            st.metric(
+                label="Energy Monitor",
+                value="🔋 Active",
+                help="Real-time energy monitoring is running"
+            )
+        else:
+            st.metric(
+                label="Energy Monitor",
+                value="⭕ Inactive",
+                help="Energy monitoring is stopped"
+            )
 
-with col3:
-    current_hour = current_time.hour
-    in_window = earliest_hour <= current_hour <= latest_hour
-    window_status = "✅ Open" if in_window else "🔒 Closed"
-    st.metric(
-        label="Time Window",
-        value=window_status,
-        help=f"Current hour: {current_hour}, Window: {earliest_hour}-{latest_hour}"
-    )
+    return current_ci, training_ok
 
-with col4:
-    # Energy monitoring status
-    if st.session_state.monitoring_active:
-        st.metric(
-            label="Energy Monitor",
-            value="🔋 Active",
-            help="Real-time energy monitoring is running"
-        )
-    else:
-        st.metric(
-            label="Energy Monitor",
-            value="⭕ Inactive",
-            help="Energy monitoring is stopped"
-        )
+current_ci, training_ok = live_metrics()
 
 st.markdown("---")
 
 # Tab layout
 tab1, tab2, tab3, tab4 = st.tabs(["📊 Real-time Monitoring", "🎯 Training Control", "📈 Analytics", "⚙️ Settings"])
 
-with tab1:
-    st.subheader("Real-time Carbon & Energy Monitoring")
+@st.fragment(run_every=live_refresh)
+def realtime_monitoring():
+    """Carbon intensity trend and live power breakdown."""
+    current_ci = get_current_carbon_intensity()
     
+    st.subheader("Real-time Carbon & Energy Monitoring")
+
     # Real-time charts
     col1, col2 = st.columns(2)
-    
+
     with col1:
         st.markdown("**Carbon Intensity Trend**")
-        # Create sample data for demonstration
         if current_ci is not None:
-            times = [datetime.now() - timedelta(minutes=x) for x in range(60, 0, -5)]
-            # Simulate some variation around current value
-            import random
-            ci_values = [current_ci + random.randint(-20, 20) for _ in times]
-            
-            fig_ci = go.Figure()
-            fig_ci.add_trace(go.Scatter(
-                x=times,
-                y=ci_values,
-                mode='lines+markers',
-                name='Carbon Intensity',
-                line=dict(color='green' if current_ci < min_ci else 'orange' if current_ci < max_ci else 'red')
-            ))
+            # Rolling window of the readings seen on each refresh; only the newest point is added
+            trend = st.session_state.ci_trend
+            trend.append((datetime.now(), current_ci))
+            # At most 60 points, well under MAX_CHART_POINTS, so no downsampling needed
+            times, ci_values = zip(*trend)
             
-            # Add threshold lines
-            fig_ci.add_hline(y=min_ci, line_dash="dash", line_color="green", 
-                           annotation_text="Optimal Threshold")
-            fig_ci.add_hline(y=max_ci, line_dash="dash", line_color="red", 
-                           annotation_text="Max Threshold")
-            
-            fig_ci.update_layout(
-                xaxis_title="Time",
-                yaxis_title="gCO2eq/kWh",
-                height=300,
-                showlegend=False
-            )
-            st.plotly_chart(fig_ci, use_container_width=True)
+            fig_ci = get_figure('ci', build_ci_figure)
+            with fig_ci.batch_update():
+                fig_ci.data[0].x = times
+                fig_ci.data[0].y = ci_values
+                fig_ci.data[0].line.color = 'green' if current_ci < min_ci else 'orange' if current_ci < max_ci else 'red'
+
+                # Move threshold lines to the current slider values
+                for shape, annotation, threshold in zip(fig_ci.layout.shapes, fig_ci.layout.annotations, (min_ci, max_ci)):
+                    shape.update(y0=threshold, y1=threshold)
+                    annotation.y = threshold
+            st.plotly_chart(fig_ci, use_container_width=True, key="ci_chart")
         else:
             st.info("Carbon intensity data unavailable")
-    
+
     with col2:
         st.markdown("**Energy Consumption**")
         if st.session_state.monitoring_active and st.session_state.energy_monitor:
             try:
                 stats = st.session_state.energy_monitor.get_realtime_stats()
                 if stats:
-                    # Create energy consumption chart
-                    fig_energy = go.Figure()
-                    
                     # Power breakdown
-                    categories = ['CPU', 'GPU', 'Total']
-                    values = [
+                    fig_energy = get_figure('energy', build_energy_figure)
+                    fig_energy.data[0].y = [
                         stats.get('cpu_power_watts', 0),
                         stats.get('gpu_power_watts', 0),
                         stats.get('total_power_watts', 0)
                     ]
-                    
-                    fig_energy.add_trace(go.Bar(
-                        x=categories,
-                        y=values,
-                        marker_color=['lightblue', 'lightgreen', 'lightcoral']
-                    ))
-                    
-                    fig_energy.update_layout(
-                        xaxis_title="Component",
-                        yaxis_title="Power (Watts)",
-                        height=300,
-                        showlegend=False
-                    )
-                    st.plotly_chart(fig_energy, use_container_width=True)
-                    
+                    st.plotly_chart(fig_energy, use_container_width=True, key="energy_chart")
+
                     # Show current stats
                     st.markdown("**Current Statistics:**")
                     st.write(f"• CPU Power: {stats.get('cpu_power_watts', 0):.1f}W")
@@ -249,6 +382,9 @@ with tab1:
         else:
             st.info("Energy monitoring not active. Start monitoring to see real-time data.")
 
+with tab1:
+    realtime_monitoring()
+
 with tab2:
     st.subheader("Training Control Center")
     
@@ -282,7 +418,7 @@ with tab2:
                         footprint = calculator.calculate_footprint(summary)
                         
                         # Store in history
-                        st.session_state.training_history.append({
+                        record_training_session({
                             'timestamp': datetime.now(),
                             'duration_hours': summary.get('duration_hours', 0),
                             'energy_kwh': summary.get('energy', {}).get('total_kwh', 0),
@@ -306,18 +442,26 @@ with tab2:
                 with st.spinner("Running simulated training session..."):
                     # Simulate training with energy tracking
                     try:
-                        with CarbonAwareTrainingSession("Dashboard Training", sampling_interval=0.5) as monitor:
-                            progress_bar = st.progress(0)
-                            for i in range(10):
-                                time.sleep(0.5)
-                                progress_bar.progress((i + 1) / 10)
-                                # Simulate some computation
-                                _ = sum(x**2 for x in range(1000))
+                        session = CarbonAwareTrainingSession("Dashboard Training", sampling_interval=0.5)
+                        with session:
+                            # Imported here so torch only loads when training is requested;
+                            # training is memoized per config, so repeat runs reuse the fitted model
+                            from optimization.optimizer import optimize_training_config
+                            from ml_engine.train import train_or_reuse_model
+                            model_cfg = optimize_training_config(current_ci, config)
+                            _, report, reused = train_or_reuse_model(model_cfg)
+                        
+                        with st.expander("📋 Model Evaluation"):
+                            st.text(report)
                         
                         # Get results
-                        session = CarbonAwareTrainingSession("Dashboard Training")
+                        measured = session.energy_tracker.get_summary().get('measurements_count', 0)
                         footprint = session.get_carbon_footprint()
-                        if footprint:
+                        if reused:
+                            st.info("Model reused from an earlier run with the same config - no training energy used.")
+                        elif not measured or not footprint or footprint.energy_kwh <= 0:
+                            st.info("Training finished too quickly to measure its energy use - no footprint to show.")
+                        else:
                             st.success(f"Training completed! Carbon footprint: {footprint.total_co2_kg:.6f} kg CO2")
                             
                             # Show equivalents
@@ -336,7 +480,7 @@ with tab2:
             st.rerun()
         
         if st.button("📊 Check Training Recommendation"):
-            rec = get_training_recommendation()
+            rec = get_training_recommendation(current_ci)
             if rec:
                 st.success("✅ Training recommended!")
             else:
@@ -346,10 +490,9 @@ with tab2:
         daily_budget = st.number_input("Daily CO2 Budget (kg)", value=0.1, step=0.01)
         
         # Calculate today's usage
-        today_usage = sum(
-            session['co2_kg'] for session in st.session_state.training_history
-            if session['timestamp'].date() == datetime.now().date()
-        )
+        history = st.session_state.history
+        today_mask = history['timestamp'].astype('datetime64[D]') == np.datetime64(datetime.now().date())
+        today_usage = float(history['co2_kg'][today_mask].sum())
         
         budget_used = (today_usage / daily_budget) * 100 if daily_budget > 0 else 0
         
@@ -365,61 +508,45 @@ with tab2:
 with tab3:
     st.subheader("Training Analytics & History")
     
-    if st.session_state.training_history:
-        # Convert to DataFrame
-        df = pd.DataFrame(st.session_state.training_history)
+    history = st.session_state.history
+    if len(history['timestamp']):
         
         col1, col2 = st.columns(2)
         
         with col1:
             st.markdown("**Carbon Footprint Over Time**")
-            fig_history = go.Figure()
-            fig_history.add_trace(go.Scatter(
-                x=df['timestamp'],
-                y=df['co2_kg'],
-                mode='lines+markers',
-                name='CO2 Emissions (kg)'
-            ))
-            fig_history.update_layout(
-                xaxis_title="Time",
-                yaxis_title="CO2 Emissions (kg)",
-                height=300
-            )
-            st.plotly_chart(fig_history, use_container_width=True)
+            history_x, history_y = downsample_series(history['timestamp'].tolist(), history['co2_kg'])
+            fig_history = get_figure('history', build_history_figure)
+            fig_history.data[0].update(x=history_x, y=history_y)
+            st.plotly_chart(fig_history, use_container_width=True, key="history_chart")
         
         with col2:
             st.markdown("**Energy vs Carbon Intensity**")
             if current_ci:
-                fig_scatter = go.Figure()
-                fig_scatter.add_trace(go.Scatter(
-                    x=df['energy_kwh'],
-                    y=df['co2_kg'],
-                    mode='markers',
-                    marker=dict(size=df['duration_hours']*20, opacity=0.6)
-                ))
-                fig_scatter.update_layout(
-                    xaxis_title="Energy Consumption (kWh)",
-                    yaxis_title="CO2 Emissions (kg)",
-                    height=300
+                fig_scatter = get_figure('scatter', build_scatter_figure)
+                fig_scatter.data[0].update(
+                    x=history['energy_kwh'],
+                    y=history['co2_kg'],
+                    marker_size=history['duration_hours']*20
                 )
-                st.plotly_chart(fig_scatter, use_container_width=True)
+                st.plotly_chart(fig_scatter, use_container_width=True, key="scatter_chart")
         
         # Summary statistics
         st.markdown("**Session Summary**")
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Total Sessions", len(df))
+            st.metric("Total Sessions", len(history['timestamp']))
         with col2:
-            st.metric("Total Energy", f"{df['energy_kwh'].sum():.4f} kWh")
+            st.metric("Total Energy", f"{history['energy_kwh'].sum():.4f} kWh")
         with col3:
-            st.metric("Total CO2", f"{df['co2_kg'].sum():.4f} kg")
+            st.metric("Total CO2", f"{history['co2_kg'].sum():.4f} kg")
         with col4:
-            st.metric("Avg Power", f"{df['avg_power_watts'].mean():.1f} W")
+            st.metric("Avg Power", f"{history['avg_power_watts'].mean():.1f} W")
         
         # Detailed history table
         with st.expander("📋 Detailed Session History"):
-            st.dataframe(df, use_container_width=True)
+            st.dataframe(history_table(history), use_container_width=True)
         
     else:
         st.info("No training history available. Run some training sessions to see analytics.")
@@ -466,11 +593,6 @@ with tab4:
                 else:
                     st.error("❌ API connection failed")
 
-# Auto-refresh functionality
-if auto_refresh:
-    time.sleep(refresh_interval)
-    st.rerun()
-
 # Footer
 st.markdown("---")
 st.markdown(
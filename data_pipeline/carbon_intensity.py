@@ -1,52 +1,144 @@
+import os
+import time
+import random
+import threading
+import datetime
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 from utils.logger import get_logger
 import yaml
+import numpy as np
 
 logger = get_logger("CarbonIntensity")
 
+CONFIG_PATH = "configs/config.yaml"
+
+# libyaml's C loader is much faster than the pure-Python one; fall back if it isn't built in
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Grid carbon intensity only changes every ~15 minutes, so API results are reused
+CI_CACHE_TTL = 900  # seconds
+_CI_CACHE = {}  # region -> {"value": ..., "ts": ..., "etag": ...}
+_CI_CACHE_STATS = {"hits": 0, "misses": 0}
+_CI_CACHE_LOCK = threading.Lock()  # Regions can be fetched from several threads at once
+
+# Shared session keeps the TCP/TLS connections alive between API calls
+MAX_PARALLEL_FETCHES = 4
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=MAX_PARALLEL_FETCHES))
+
+@functools.lru_cache(maxsize=1)
+def _load_config_cached(path, mtime):
+    # mtime is only part of the cache key so edits to the file invalidate it
+    with open(path, "r") as f:
+        return yaml.load(f, Loader=_YAML_LOADER)
+
 def load_config():
-    with open("configs/config.yaml", "r") as f:
-        return yaml.safe_load(f)
+    """Load the YAML config, re-parsing only when the file has changed on disk."""
+    return _load_config_cached(CONFIG_PATH, os.stat(CONFIG_PATH).st_mtime)
 
-def get_carbon_intensity():
+def invalidate_config_cache():
+    """Drop the cached config so the next load_config() re-reads the file."""
+    _load_config_cached.cache_clear()
+
+def _fetch_electricitymap(region, api_key):
+    cached = _CI_CACHE.get(region)
+    fresh = cached is not None and time.time() - cached["ts"] < CI_CACHE_TTL
+    with _CI_CACHE_LOCK:
+        _CI_CACHE_STATS["hits" if fresh else "misses"] += 1
+    if fresh:
+        return cached["value"]
+
+    url = f"https://api.electricitymap.org/v3/carbon-intensity/latest?zone={region}"
+    headers = {"auth-token": api_key}
+    # Expired entries are revalidated: an unchanged reading comes back as an empty 304
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    try:
+        r = _SESSION.get(url, headers=headers, timeout=10)
+    except requests.RequestException as e:
+        logger.error(f"Failed to fetch carbon intensity: {e}")
+        return None
+    if r.status_code == 304 and cached:
+        cached["ts"] = time.time()
+        logger.info(f"Carbon intensity in {region} unchanged: {cached['value']} gCO2eq/kWh")
+        return cached["value"]
+    if r.status_code == 200:
+        carbon_intensity = r.json().get("carbonIntensity", None)
+        logger.info(f"Current carbon intensity in {region}: {carbon_intensity} gCO2eq/kWh")
+        if carbon_intensity is not None:
+            _CI_CACHE[region] = {
+                "value": carbon_intensity,
+                "ts": time.time(),
+                "etag": r.headers.get("ETag")
+            }
+        return carbon_intensity
+    else:
+        logger.error(f"Failed to fetch carbon intensity: {r.text}")
+        return None
+
+def ci_cache_metrics():
+    """Hit/miss counts and size of the carbon intensity cache."""
+    with _CI_CACHE_LOCK:
+        hits = _CI_CACHE_STATS["hits"]
+        misses = _CI_CACHE_STATS["misses"]
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / lookups if lookups else 0.0,
+        "size": len(_CI_CACHE)
+    }
+
+# Mock model of the daily grid curve: (base, jitter) gCO2eq/kWh for each hour of the day.
+# Night is low, morning (7-9) and evening (18-22) peaks are high, the rest is medium.
+HOUR_TABLE = np.array(
+    [(150, 30)] * 7 + [(350, 50)] * 3 + [(250, 40)] * 8 + [(350, 50)] * 5 + [(250, 40)] * 1,
+    dtype=[('base', 'i4'), ('jitter', 'i4')]
+)
+
+def _mock_carbon_intensity(region):
+    # Mock implementation for testing without real API
+    # Generate realistic carbon intensity values based on time of day
+    row = HOUR_TABLE[datetime.datetime.now().hour]
+    jitter = int(row['jitter'])
+    # Uniform integer in [-jitter, jitter]
+    base_intensity = int(row['base']) + int(random.random() * (2 * jitter + 1)) - jitter
+    logger.info(f"Mock carbon intensity in {region}: {base_intensity} gCO2eq/kWh (simulated)")
+    return base_intensity
+
+def get_carbon_intensity(region=None):
     cfg = load_config()
     provider = cfg['carbon_api']['provider']
     api_key = cfg['carbon_api']['api_key']
-    region = cfg['carbon_api']['region']
+    region = region or cfg['carbon_api']['region']
 
     if provider == "electricitymap":
-        url = f"https://api.electricitymap.org/v3/carbon-intensity/latest?zone={region}"
-        headers = {"auth-token": api_key}
-        r = requests.get(url, headers=headers)
-        if r.status_code == 200:
-            carbon_intensity = r.json().get("carbonIntensity", None)
-            logger.info(f"Current carbon intensity in {region}: {carbon_intensity} gCO2eq/kWh")
-            return carbon_intensity
-        else:
-            logger.error(f"Failed to fetch carbon intensity: {r.text}")
-            return None
+        return _fetch_electricitymap(region, api_key)
     elif provider == "mock":
-        # Mock implementation for testing without real API
-        import random
-        import datetime
-        
-        # Generate realistic carbon intensity values based on time of day
-        now = datetime.datetime.now()
-        hour = now.hour
-        
-        # Lower carbon intensity during off-peak hours (night/early morning)
-        if 0 <= hour <= 6:
-            base_intensity = 150 + random.randint(-30, 30)  # Low
-        elif 7 <= hour <= 9 or 18 <= hour <= 22:
-            base_intensity = 350 + random.randint(-50, 50)  # High (peak hours)
-        else:
-            base_intensity = 250 + random.randint(-40, 40)  # Medium
-            
-        logger.info(f"Mock carbon intensity in {region}: {base_intensity} gCO2eq/kWh (simulated)")
-        return base_intensity
+        return _mock_carbon_intensity(region)
     else:
         logger.error("Unknown provider")
         return None
 
+def get_carbon_intensities(regions):
+    """
+    Fetch carbon intensity for several regions concurrently.
+
+    The API calls are network-bound, so they are issued from a small thread
+    pool sharing the module session instead of one after another.
+
+    Returns:
+        Dict mapping each region to its carbon intensity (or None)
+    """
+    regions = list(regions)
+    if not regions:
+        return {}
+    workers = min(MAX_PARALLEL_FETCHES, len(regions))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(regions, pool.map(get_carbon_intensity, regions)))
+
 if __name__ == "__main__":
     get_carbon_intensity()
\ No newline at end of file
@@ -7,9 +7,26 @@ import sys
 import os
 import time
 
+import numpy as np
+
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+def _synthetic_matmul_load(seconds: float):
+    """
+    Keep the CPU busy with float32 matrix multiplies for a fixed wall-clock time.
+    
+    The work goes through BLAS like real ML compute, so the measured energy
+    doesn't depend on interpreter overhead or the Python version.
+    """
+    rng = np.random.default_rng(0)
+    a = rng.standard_normal((512, 512), dtype=np.float32)
+    b = a.T.copy()
+    out = np.empty_like(a)
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        np.matmul(a, b, out=out)
+
 def demo_carbon_intensity():
     """Demo carbon intensity fetching."""
     print("🌍 Testing Carbon Intensity API...")
@@ -41,7 +58,7 @@ def demo_energy_monitoring():
             for i in range(3):
                 print(f"  Working... {i+1}/3")
                 # Light computation to generate some CPU activity
-                _ = sum(x**2 for x in range(100000))
+                _ = np.square(np.arange(100000, dtype=np.float64)).sum()
                 time.sleep(1)
         
         # Get summary
@@ -64,30 +81,22 @@ def demo_carbon_calculation():
         from utils.carbon_calculator import CarbonAwareTrainingSession
         
         print("Running carbon-aware training simulation...")
-        with CarbonAwareTrainingSession("Demo Training", sampling_interval=0.5) as session:
+        session = CarbonAwareTrainingSession("Demo Training", sampling_interval=0.5)
+        with session:
             # Simulate ML training
-            print("  Training epoch 1/3...")
-            _ = sum(x**2 for x in range(200000))
-            time.sleep(1)
-            
-            print("  Training epoch 2/3...")
-            _ = sum(x**3 for x in range(200000))
-            time.sleep(1)
-            
-            print("  Training epoch 3/3...")
-            _ = sum(x**0.5 for x in range(1, 200000))
-            time.sleep(1)
+            for epoch in range(3):
+                print(f"  Training epoch {epoch + 1}/3...")
+                _synthetic_matmul_load(1.0)
         
         # Get carbon footprint
-        training_session = CarbonAwareTrainingSession("Demo Training")
-        footprint = training_session.get_carbon_footprint()
+        footprint = session.get_carbon_footprint()
         if footprint:
             print(f"✅ Carbon footprint: {footprint.total_co2_grams:.2f}g CO2")
             print(f"✅ Energy used: {footprint.energy_kwh:.6f} kWh")
             print(f"✅ Duration: {footprint.duration_hours:.4f} hours")
             
             # Show equivalents
-            equivalents = training_session.get_equivalents()
+            equivalents = session.get_equivalents()
             print("🌍 Environmental equivalents:")
             for key, value in list(equivalents.items())[:3]:  # Show first 3
                 print(f"   • {key.replace('_', ' ').title()}: {value}")
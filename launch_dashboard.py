@@ -5,42 +5,44 @@ Launch script for the Carbon-Aware ML Dashboard.
 
 import sys
 import os
-import subprocess
 
 def main():
     """Launch the Streamlit dashboard."""
-    print("🌱 Starting Carbon-Aware ML Dashboard...")
-    
     # Add current directory to Python path
     current_dir = os.path.dirname(os.path.abspath(__file__))
     sys.path.insert(0, current_dir)
     
+    # Everything goes through the (queued) logger so it stays in order with module logs
+    from utils.logger import get_logger
+    logger = get_logger("Launcher")
+    logger.info("🌱 Starting Carbon-Aware ML Dashboard...")
+    
     # Dashboard file path
     dashboard_path = os.path.join(current_dir, "dashboard", "streamlit_app.py")
     
     if not os.path.exists(dashboard_path):
-        print(f"❌ Dashboard file not found: {dashboard_path}")
+        logger.error("❌ Dashboard file not found: %s", dashboard_path)
         return
     
-    print(f"📊 Launching dashboard from: {dashboard_path}")
-    print("🌐 Dashboard will open in your default browser")
-    print("⏹️  Press Ctrl+C to stop the dashboard")
+    logger.info("📊 Launching dashboard from: %s", dashboard_path)
+    logger.info("🌐 Dashboard will open in your default browser")
+    logger.info("⏹️  Press Ctrl+C to stop the dashboard")
     
     try:
-        # Launch Streamlit
-        subprocess.run([
-            sys.executable, "-m", "streamlit", "run", 
-            dashboard_path,
-            "--theme.base", "light",
-            "--theme.primaryColor", "#00C851",
-            "--theme.backgroundColor", "#FFFFFF"
-        ])
+        # Run Streamlit in-process instead of spawning a second interpreter
+        from streamlit.web import bootstrap
+        flag_options = {
+            "theme.base": "light",
+            "theme.primaryColor": "#00C851",
+            "theme.backgroundColor": "#FFFFFF"
+        }
+        bootstrap.load_config_options(flag_options=flag_options)
+        bootstrap.run(dashboard_path, False, [], flag_options)
     except KeyboardInterrupt:
-        print("\n👋 Dashboard stopped by user")
+        logger.info("👋 Dashboard stopped by user")
     except Exception as e:
-        print(f"❌ Error launching dashboard: {e}")
-        print("\n💡 Make sure you have installed the requirements:")
-        print("   pip install streamlit plotly")
+        logger.error("❌ Error launching dashboard: %s", e)
+        logger.info("💡 Make sure you have installed the requirements: pip install streamlit plotly")
 
 if __name__ == "__main__":
     main()
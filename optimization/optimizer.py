@@ -1,20 +1,70 @@
+import copy
+import importlib.util
+import psutil
 from utils.logger import get_logger
 
+# Only the PyTorch training path honours use_mixed_precision. Checked without importing
+# torch, which would otherwise load with every page of the dashboard
+TORCH_AVAILABLE = importlib.util.find_spec("torch") is not None
+
 logger = get_logger("Optimizer")
 
+# Batch size scaling per carbon intensity bucket (bucket edges come from cfg['train'])
+BATCH_SIZE_FACTORS = {'low': 1.0, 'moderate': 0.75, 'high': 0.5}
+MIN_BATCH_SIZE = 32
+# Half-precision activations leave room for twice the batch if this much memory is free
+MIN_FREE_BYTES_FOR_DOUBLING = 1 << 30  # 1 GiB
+# Tensor cores want matmul dimensions in multiples of 8
+BATCH_SIZE_MULTIPLE = 8
+
+def _ci_bucket(ci, train_cfg):
+    """Classify ci against the configured thresholds (both edges count as moderate)."""
+    if ci > train_cfg['max_carbon_intensity']:
+        return 'high'
+    if ci < train_cfg['min_carbon_intensity']:
+        return 'low'
+    return 'moderate'
+
+def _available_memory_bytes():
+    """Free memory on the device training will run on (only called when torch is installed)."""
+    import torch
+    if torch.cuda.is_available():
+        free, _ = torch.cuda.mem_get_info()
+        return free
+    return psutil.virtual_memory().available
+
+def _round_up(n, multiple):
+    return -(-n // multiple) * multiple
+
 def optimize_training_config(ci, cfg):
-    # Simple logic: If carbon intensity is high, use more efficient settings
+    """
+    Adapt the model settings to the current carbon intensity.
+
+    Higher intensity shrinks the batch and forces mixed precision; mixed
+    precision doubles the batch when training will run in PyTorch (sklearn
+    ignores it) and the device has memory to spare. The result is rounded up
+    to a multiple of 8.
+
+    Returns:
+        A new model config dict; cfg itself is left untouched
+    """
+    # cfg is the shared cached config, so work on a private copy of the model section
     if ci is None:
-        return cfg['model']
+        return copy.deepcopy(cfg['model'])
 
-    new_cfg = cfg['model'].copy()
-    if ci > cfg['train']['max_carbon_intensity']:
+    new_cfg = copy.deepcopy(cfg['model'])
+    bucket = _ci_bucket(ci, cfg['train'])
+    if bucket == 'high':
         logger.info("High carbon intensity: enabling aggressive optimization")
         new_cfg['use_mixed_precision'] = True
-        new_cfg['batch_size'] = max(32, new_cfg['batch_size'] // 2)
-    elif ci < cfg['train']['min_carbon_intensity']:
+    elif bucket == 'low':
         logger.info("Low carbon intensity: using default settings")
     else:
         logger.info("Moderate carbon intensity: moderate optimization")
-        new_cfg['batch_size'] = int(new_cfg['batch_size'] * 0.75)
-    return new_cfg
\ No newline at end of file
+
+    batch_size = max(MIN_BATCH_SIZE, int(new_cfg['batch_size'] * BATCH_SIZE_FACTORS[bucket]))
+    use_amp = new_cfg.get('use_mixed_precision') and TORCH_AVAILABLE
+    if use_amp and _available_memory_bytes() >= MIN_FREE_BYTES_FOR_DOUBLING:
+        batch_size *= 2
+    new_cfg['batch_size'] = _round_up(batch_size, BATCH_SIZE_MULTIPLE)
+    return new_cfg
@@ -1,37 +1,50 @@
 from data_pipeline.carbon_intensity import get_carbon_intensity, load_config
 from utils.logger import get_logger
 
-import datetime
+import time
 
 logger = get_logger("Scheduler")
 
-def schedule_training():
-    cfg = load_config()
+def schedule_training(cfg=None, ci=None):
+    """
+    Decide whether training should start now.
+    
+    Args:
+        cfg: Loaded project config; read with load_config() when not provided
+        ci: Carbon intensity already fetched by the caller (gCO2eq/kWh);
+            looked up here (cached reading first, API on a miss) when not provided
+            
+    Returns:
+        True if the time window is open and carbon intensity is acceptable
+    """
+    if cfg is None:
+        cfg = load_config()
     earliest = cfg['train']['earliest_start_hour']
     latest = cfg['train']['latest_start_hour']
     min_intensity = cfg['train']['min_carbon_intensity']
     max_intensity = cfg['train']['max_carbon_intensity']
 
-    now = datetime.datetime.now()
-    current_hour = now.hour
+    current_hour = time.localtime().tm_hour
 
     logger.info("Checking if current time is within the allowed window...")
     if not (earliest <= current_hour <= latest):
-        logger.info(f"Current time {current_hour} not in allowed window ({earliest}-{latest}), will wait.")
+        logger.info("Current time %s not in allowed window (%s-%s), will wait.", current_hour, earliest, latest)
         return False
 
-    ci = get_carbon_intensity()
+    # Only consult carbon intensity once the cheap time-window check has passed
+    if ci is None:
+        ci = get_carbon_intensity(cfg['carbon_api']['region'])
     if ci is None:
         logger.warning("Could not get carbon intensity, proceeding anyway.")
         return True
     elif ci < min_intensity:
-        logger.info(f"Low carbon intensity ({ci}), optimal for training.")
+        logger.info("Low carbon intensity (%s), optimal for training.", ci)
         return True
     elif ci > max_intensity:
-        logger.info(f"High carbon intensity ({ci}), not optimal. Consider waiting.")
+        logger.info("High carbon intensity (%s), not optimal. Consider waiting.", ci)
         return False
     else:
-        logger.info(f"Carbon intensity ({ci}) in acceptable range.")
+        logger.info("Carbon intensity (%s) in acceptable range.", ci)
         return True
 
 if __name__ == "__main__":
@@ -1,5 +1,7 @@
 import unittest
+import numpy as np
 from unittest.mock import patch, MagicMock
+from data_pipeline import carbon_intensity
 from utils.carbon_calculator import CarbonCalculator, CarbonFootprint, CarbonAwareTrainingSession
 
 class TestCarbonCalculator(unittest.TestCase):
@@ -25,6 +27,37 @@ class TestCarbonCalculator(unittest.TestCase):
         self.assertEqual(footprint.energy_kwh, 0.1)
         self.assertEqual(footprint.avg_carbon_intensity, 400)
         self.assertEqual(footprint.total_co2_grams, 40.0)  # 0.1 kWh * 400 gCO2eq/kWh
+        self.assertEqual(footprint.total_co2_kg, 0.04)
+    
+    def test_calculate_footprint_keeps_exact_inputs(self):
+        """Test tiny energies and fractional inputs come back unrounded."""
+        energy_summary = {'energy': {'total_kwh': 1.234567891234e-12}, 'duration_hours': 1e-10}
+        footprint = self.calculator.calculate_footprint(energy_summary, carbon_intensity=300.123456789123)
+        self.assertEqual(footprint.energy_kwh, 1.234567891234e-12)
+        self.assertEqual(footprint.avg_carbon_intensity, 300.123456789123)
+        self.assertEqual(footprint.duration_hours, 1e-10)
+        self.assertGreater(footprint.total_co2_grams, 0)
+    
+    @patch('data_pipeline.carbon_intensity._SESSION')
+    @patch('data_pipeline.carbon_intensity.load_config')
+    def test_carbon_intensity_cache_shared_across_calculators(self, mock_load_config, mock_session):
+        """Test a fresh calculator reuses the reading cached by another one."""
+        mock_load_config.return_value = {
+            'carbon_api': {'provider': 'electricitymap', 'api_key': 'key', 'region': self.calculator.region}
+        }
+        mock_session.get.return_value = MagicMock(
+            status_code=200, headers={}, json=lambda: {'carbonIntensity': 321}
+        )
+        carbon_intensity._CI_CACHE.pop(self.calculator.region, None)
+        before = CarbonCalculator.cache_metrics()
+        
+        self.assertEqual(self.calculator.get_carbon_intensity_cached(), 321)
+        self.assertEqual(CarbonCalculator().get_carbon_intensity_cached(), 321)
+        
+        after = CarbonCalculator.cache_metrics()
+        self.assertEqual(mock_session.get.call_count, 1)
+        self.assertEqual(after['misses'] - before['misses'], 1)
+        self.assertEqual(after['hits'] - before['hits'], 1)
     
     def test_calculate_equivalent_emissions(self):
         """Test emission equivalents calculation."""
@@ -38,6 +71,25 @@ class TestCarbonCalculator(unittest.TestCase):
         self.assertIn('miles', equivalents['car_driving_miles'])
         self.assertIn('charges', equivalents['smartphone_charges'])
     
+    def test_calculate_equivalent_emissions_array(self):
+        """Test array input gives the same strings as the scalar path."""
+        co2 = np.array([0.5, 1.0, 2.0])
+        equivalents = self.calculator.calculate_equivalent_emissions(co2)
+        
+        for i, value in enumerate(co2):
+            scalar = self.calculator.calculate_equivalent_emissions(float(value))
+            for key, text in scalar.items():
+                self.assertEqual(equivalents[key][i], text)
+    
+    @patch('utils.carbon_calculator.get_carbon_intensity', return_value=300)
+    def test_training_session_context_returns_session(self, mock_get_ci):
+        """Test the with-target is the session itself, usable after the block."""
+        session = CarbonAwareTrainingSession("Test", sampling_interval=0.1)
+        with session as tracked:
+            self.assertIs(tracked, session)
+            self.assertIsInstance(tracked.get_realtime_stats(), dict)
+        self.assertIsInstance(session.get_carbon_footprint(), CarbonFootprint)
+    
     def test_carbon_budget_status(self):
         """Test carbon budget status calculation."""
         status = self.calculator.get_carbon_budget_status(1.0, daily_budget_kg=5.0)
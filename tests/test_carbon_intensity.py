@@ -1,10 +1,93 @@
 import unittest
-from data_pipeline.carbon_intensity import get_carbon_intensity
+from unittest.mock import patch, MagicMock
+from data_pipeline import carbon_intensity
+from data_pipeline.carbon_intensity import (
+    get_carbon_intensity, get_carbon_intensities, load_config, invalidate_config_cache
+)
 
 class TestCarbonIntensity(unittest.TestCase):
-    def test_api_returns_value(self):
+    @patch('data_pipeline.carbon_intensity._SESSION')
+    @patch('data_pipeline.carbon_intensity.load_config')
+    def test_api_returns_value(self, mock_load_config, mock_session):
+        mock_load_config.return_value = {
+            'carbon_api': {'provider': 'electricitymap', 'api_key': 'key', 'region': 'TEST'}
+        }
+        mock_session.get.return_value = MagicMock(
+            status_code=200, headers={}, json=lambda: {'carbonIntensity': 250}
+        )
+        carbon_intensity._CI_CACHE.pop('TEST', None)
         ci = get_carbon_intensity()
-        self.assertTrue(ci is None or isinstance(ci, (int, float)))
+        self.assertIsInstance(ci, (int, float))
+
+    @patch('data_pipeline.carbon_intensity._SESSION')
+    @patch('data_pipeline.carbon_intensity.load_config')
+    def test_api_error_returns_none(self, mock_load_config, mock_session):
+        mock_load_config.return_value = {
+            'carbon_api': {'provider': 'electricitymap', 'api_key': 'key', 'region': 'TEST'}
+        }
+        mock_session.get.side_effect = carbon_intensity.requests.ConnectionError("offline")
+        carbon_intensity._CI_CACHE.pop('TEST', None)
+        self.assertIsNone(get_carbon_intensity())
+
+    def test_load_config_is_cached(self):
+        self.assertIs(load_config(), load_config())
+
+    def test_invalidate_config_cache(self):
+        cfg = load_config()
+        invalidate_config_cache()
+        reloaded = load_config()
+        self.assertIsNot(cfg, reloaded)
+        self.assertEqual(cfg, reloaded)
+
+    @patch('data_pipeline.carbon_intensity._SESSION')
+    @patch('data_pipeline.carbon_intensity.load_config')
+    def test_api_result_is_cached(self, mock_load_config, mock_session):
+        """Test repeated calls within the TTL reuse the API result."""
+        mock_load_config.return_value = {
+            'carbon_api': {'provider': 'electricitymap', 'api_key': 'key', 'region': 'TEST'}
+        }
+        mock_session.get.return_value = MagicMock(
+            status_code=200, json=lambda: {'carbonIntensity': 123}
+        )
+        carbon_intensity._CI_CACHE.pop('TEST', None)
+
+        self.assertEqual(get_carbon_intensity(), 123)
+        self.assertEqual(get_carbon_intensity(), 123)
+        self.assertEqual(mock_session.get.call_count, 1)
+
+    @patch('data_pipeline.carbon_intensity._SESSION')
+    @patch('data_pipeline.carbon_intensity.load_config')
+    def test_expired_entry_revalidated_with_etag(self, mock_load_config, mock_session):
+        """Test an expired reading is revalidated and a 304 reuses the cached value."""
+        mock_load_config.return_value = {
+            'carbon_api': {'provider': 'electricitymap', 'api_key': 'key', 'region': 'TEST'}
+        }
+        mock_session.get.return_value = MagicMock(
+            status_code=200, headers={'ETag': '"v1"'}, json=lambda: {'carbonIntensity': 123}
+        )
+        carbon_intensity._CI_CACHE.pop('TEST', None)
+        self.assertEqual(get_carbon_intensity(), 123)
+
+        carbon_intensity._CI_CACHE['TEST']['ts'] -= carbon_intensity.CI_CACHE_TTL
+        mock_session.get.return_value = MagicMock(status_code=304)
+        self.assertEqual(get_carbon_intensity(), 123)
+
+        headers = mock_session.get.call_args.kwargs['headers']
+        self.assertEqual(headers['If-None-Match'], '"v1"')
+        # The revalidated entry is fresh again, so no further request is made
+        self.assertEqual(get_carbon_intensity(), 123)
+        self.assertEqual(mock_session.get.call_count, 2)
+
+    @patch('data_pipeline.carbon_intensity.load_config')
+    def test_multi_region_fetch(self, mock_load_config):
+        """Test fetching several regions returns a value per region."""
+        mock_load_config.return_value = {
+            'carbon_api': {'provider': 'mock', 'api_key': '', 'region': 'TEST'}
+        }
+        result = get_carbon_intensities(['DE', 'FR'])
+        self.assertEqual(set(result), {'DE', 'FR'})
+        for ci in result.values():
+            self.assertIsInstance(ci, int)
 
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -1,7 +1,10 @@
 import unittest
 from unittest.mock import patch, MagicMock
+import os
+import tempfile
+import threading
 import time
-from utils.energy_monitor import EnergyMonitor, EnergyTracker
+from utils.energy_monitor import EnergyMonitor, EnergyTracker, load_spilled_samples
 
 class TestEnergyMonitor(unittest.TestCase):
     def test_energy_monitor_initialization(self):
@@ -37,5 +40,228 @@ class TestEnergyMonitor(unittest.TestCase):
         self.assertGreaterEqual(power, 0)
         self.assertEqual(util, 50.0)
 
+    def test_sample_ring_buffer_keeps_latest(self):
+        """Test the buffer keeps the latest samples while the summary covers all of them."""
+        monitor = EnergyMonitor(buffer_size=4)
+        for t in range(6):
+            monitor._record((float(t), 10.0 * t, 0.0, 10.0 * t, 50.0, 0.0, 1.0))
+        
+        self.assertEqual([m.timestamp for m in monitor.measurements], [2.0, 3.0, 4.0, 5.0])
+        self.assertEqual(monitor.get_realtime_stats()['total_power_watts'], 50.0)
+        self.assertEqual(monitor.latest_measurement().timestamp, 5.0)
+        
+        summary = monitor.get_summary()
+        self.assertEqual(summary['measurements_count'], 6)
+        self.assertEqual(summary['duration_seconds'], 5.0)
+        self.assertEqual(summary['power']['avg_total_watts'], 25.0)
+        self.assertEqual(summary['power']['peak_total_watts'], 50.0)
+        # Power ramps linearly 0 -> 50 W over 5 s: 125 J
+        self.assertAlmostEqual(summary['energy']['total_kwh'], 125.0 / 3.6e6)
+    
+    def test_cpu_percent_primed_on_sampling_thread(self):
+        """Test psutil's per-thread utilization baseline is set by the thread that samples."""
+        monitor = EnergyMonitor(sampling_interval=0.05)
+        callers = []
+        
+        def cpu_percent(interval=None):
+            callers.append(threading.get_ident())
+            return 50.0
+        
+        with patch('utils.energy_monitor.psutil.cpu_percent', side_effect=cpu_percent):
+            monitor.start_monitoring()
+            time.sleep(0.2)
+            monitor.stop_monitoring()
+        
+        # One priming call, then one per recorded sample, all on the monitor thread
+        self.assertEqual(len(callers), monitor._count + 1)
+        self.assertEqual(set(callers), {monitor.monitor_thread.ident})
+    
+    def test_slow_samples_are_counted_as_dropped(self):
+        """Test samples that overrun the interval are reported rather than stretching it."""
+        monitor = EnergyMonitor(sampling_interval=0.05)
+        
+        def slow_cpu_power():
+            time.sleep(0.12)
+            return 10.0, 50.0
+        
+        with patch.object(monitor, '_get_cpu_power', side_effect=slow_cpu_power):
+            monitor.start_monitoring()
+            time.sleep(0.5)
+            summary = monitor.stop_monitoring()
+        
+        self.assertGreater(summary['dropped_samples'], 0)
+        self.assertEqual(summary['power']['avg_cpu_watts'], 10.0)
+    
+    def test_single_stall_drops_exact_slot_count(self):
+        """Test a stall of 2.6 intervals loses exactly the one slot that passed entirely."""
+        monitor = EnergyMonitor(sampling_interval=0.1)
+        calls = []
+        
+        def cpu_power():
+            calls.append(None)
+            if len(calls) == 2:
+                time.sleep(0.26)
+            return 10.0, 50.0
+        
+        with patch.object(monitor, '_get_cpu_power', side_effect=cpu_power):
+            monitor.start_monitoring()
+            time.sleep(0.8)
+            summary = monitor.stop_monitoring()
+        
+        self.assertEqual(summary['dropped_samples'], 1)
+    
+    def test_tracker_reuses_shared_monitor(self):
+        """Test a tracker given a monitor resets it between runs and leaves it open."""
+        monitor = EnergyMonitor(sampling_interval=0.1)
+        monitor._record((0.0, 10.0, 0.0, 10.0, 50.0, 0.0, 1.0))
+        
+        with patch.object(monitor, 'close') as mock_close:
+            with EnergyTracker(sampling_interval=0.05, monitor=monitor) as tracked:
+                self.assertIs(tracked, monitor)
+                time.sleep(0.2)
+        
+        mock_close.assert_not_called()
+        self.assertEqual(monitor.sampling_interval, 0.05)
+        # The stale sample recorded at t=0 was cleared by the reset
+        self.assertGreater(monitor.measurements[0].timestamp, 0.0)
+    
+    def test_energy_covers_whole_run(self):
+        """Test the time before the first sample and after the last one is integrated."""
+        monitor = EnergyMonitor()
+        monitor._t_start = 995.0
+        for t in range(6):
+            monitor._record((1000.0 + t, 10.0, 0.0, 10.0, 50.0, 0.0, 1.0))
+        monitor._finish(1010.0)
+        
+        summary = monitor.get_summary()
+        self.assertEqual(summary['duration_seconds'], 15.0)
+        self.assertAlmostEqual(summary['energy']['total_kwh'], 150.0 / 3.6e6)
+    
+    def test_samples_spill_to_disk(self):
+        """Test samples beyond the ring are written to disk in chunks and read back in order."""
+        with tempfile.TemporaryDirectory() as spill_dir:
+            monitor = EnergyMonitor(buffer_size=4, spill_dir=spill_dir)
+            for t in range(10):
+                monitor._record((1000.0 + t, 10.0, 0.0, 10.0, 50.0, 0.0, 1.0))
+            self.assertEqual(len(os.listdir(spill_dir)), 2)
+            
+            monitor._spill()  # as stop_monitoring does for the partial tail
+            samples = load_spilled_samples(spill_dir)
+        
+        self.assertEqual(samples.shape, (7, 10))
+        self.assertEqual(samples[0].tolist(), [1000.0 + t for t in range(10)])
+    
+    def test_failed_spill_is_retried(self):
+        """Test a failed write is retried on later samples, keeping what is still in the ring."""
+        with tempfile.TemporaryDirectory() as spill_dir:
+            monitor = EnergyMonitor(buffer_size=4, spill_dir=spill_dir)
+            with patch('utils.energy_monitor.np.savez_compressed', side_effect=OSError("disk full")):
+                for t in range(6):
+                    monitor._record((1000.0 + t, 10.0, 0.0, 10.0, 50.0, 0.0, 1.0))
+            
+            with self.assertLogs('EnergyMonitor', level='WARNING'):
+                monitor._record((1006.0, 10.0, 0.0, 10.0, 50.0, 0.0, 1.0))
+            samples = load_spilled_samples(spill_dir)
+        
+        self.assertEqual(samples[0].tolist(), [1003.0, 1004.0, 1005.0, 1006.0])
+    
+    def test_adaptive_interval_backs_off_and_resets(self):
+        """Test steady power stretches the interval up to the cap and a jump resets it."""
+        monitor = EnergyMonitor(sampling_interval=0.1, interval_max=0.5)
+        interval, stable = 0.1, 0
+        for _ in range(20):
+            interval, stable = monitor._next_interval(interval, 0.0, stable, 0.0)
+        self.assertEqual(interval, 0.5)
+        
+        interval, stable = monitor._next_interval(interval, 50.0, stable, 0.0)
+        self.assertEqual((interval, stable), (0.1, 0))
+        
+        # A sample costing 2 ms of CPU needs a 0.2 s period to stay within 1% overhead
+        interval, _ = monitor._next_interval(0.1, 50.0, 0, 0.002)
+        self.assertAlmostEqual(interval, 0.2)
+    
+    def test_run_shorter_than_interval_is_sampled_at_start_and_stop(self):
+        """Test a run shorter than one interval still gets a first and a final sample."""
+        monitor = EnergyMonitor(sampling_interval=10.0)
+        monitor.start_monitoring()
+        time.sleep(0.3)
+        before_stop = time.time()
+        summary = monitor.stop_monitoring()
+        
+        self.assertEqual(summary['measurements_count'], 2)
+        self.assertGreaterEqual(monitor.latest_measurement().timestamp, before_stop)
+    
+    def test_stop_interrupts_long_interval(self):
+        """Test stopping doesn't wait out a long (adaptive) sampling interval."""
+        monitor = EnergyMonitor(sampling_interval=10.0, interval_max=60.0)
+        monitor.start_monitoring()
+        start = time.monotonic()
+        monitor.stop_monitoring()
+        
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertFalse(monitor.monitor_thread.is_alive())
+    
+    def test_cpu_and_gpu_sampled_concurrently(self):
+        """Test the CPU reading runs off the monitor thread while it reads the GPU."""
+        with patch.object(EnergyMonitor, '_init_gpu_monitoring', return_value=True):
+            monitor = EnergyMonitor()
+        threads = {}
+        
+        def reading(name, value):
+            def read():
+                threads[name] = threading.get_ident()
+                return value
+            return read
+        
+        with patch.object(monitor, '_get_cpu_power', side_effect=reading('cpu', (20.0, 50.0))), \
+             patch.object(monitor, '_get_gpu_power', side_effect=reading('gpu', (100.0, 40.0))):
+            self.assertEqual(monitor._sample_power(), (20.0, 50.0, 100.0, 40.0))
+        
+        self.assertEqual(threads['gpu'], threading.get_ident())
+        self.assertNotEqual(threads['cpu'], threads['gpu'])
+        monitor.close()
+    
+    def test_invalid_intervals_rejected(self):
+        """Test settings that would give zero or negative sleep intervals raise ValueError."""
+        for kwargs in ({'sampling_interval': 0},
+                       {'sampling_interval': 1.0, 'interval_max': 0.5},
+                       {'interval_max': 5.0, 'target_overhead_fraction': 0},
+                       {'interval_max': 5.0, 'target_overhead_fraction': -0.1}):
+            with self.subTest(**kwargs), self.assertRaises(ValueError):
+                EnergyMonitor(**kwargs)
+    
+    @patch('utils.energy_monitor.GPUtil', create=True)
+    def test_gpu_power_gputil_fallback(self, mock_gputil):
+        """Test the GPUtil estimate treats a missing load as idle."""
+        mock_gputil.getGPUs.return_value = [MagicMock(load=0.5), MagicMock(load=None)]
+        
+        monitor = EnergyMonitor()
+        monitor.gpu_available = True
+        monitor._nvml_handles = []
+        power, util = monitor._get_gpu_power()
+        
+        self.assertEqual(power, 125.0)
+        self.assertEqual(util, 25.0)
+    
+    @patch('utils.energy_monitor.nvml', create=True)
+    def test_gpu_power_uses_cached_nvml_handles(self, mock_nvml):
+        """Test GPU sampling reads the handles found at init without re-enumerating."""
+        mock_nvml.nvmlDeviceGetPowerUsage.return_value = 150000  # mW
+        mock_nvml.nvmlDeviceGetUtilizationRates.return_value = MagicMock(gpu=40)
+        
+        monitor = EnergyMonitor()
+        monitor.gpu_available = True
+        monitor._nvml_handles = ['gpu0', 'gpu1']
+        power, util = monitor._get_gpu_power()
+        
+        self.assertEqual(power, 300.0)
+        self.assertEqual(util, 40.0)
+        mock_nvml.nvmlDeviceGetCount.assert_not_called()
+        mock_nvml.nvmlDeviceGetHandleByIndex.assert_not_called()
+        
+        monitor.close()
+        mock_nvml.nvmlShutdown.assert_called_once()
+        self.assertEqual(monitor._nvml_handles, [])
+
 if __name__ == "__main__":
     unittest.main()
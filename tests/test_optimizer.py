@@ -1,14 +1,71 @@
 import unittest
-from optimization.optimizer import optimize_training_config
-from data_pipeline.carbon_intensity import load_config
+from unittest.mock import patch
+from optimization.optimizer import optimize_training_config, MIN_FREE_BYTES_FOR_DOUBLING
+
+CONFIG = {
+    'train': {'min_carbon_intensity': 180, 'max_carbon_intensity': 400},
+    'model': {'type': 'simple_mlp', 'epochs': 10, 'batch_size': 64, 'use_mixed_precision': True}
+}
 
 class TestOptimizer(unittest.TestCase):
     def test_optimizer_config(self):
-        cfg = load_config()
+        cfg = CONFIG
         ci = 500  # Simulate high carbon intensity
         new_cfg = optimize_training_config(ci, cfg)
         self.assertIn('batch_size', new_cfg)
         self.assertIn('use_mixed_precision', new_cfg)
 
+    def test_optimizer_does_not_mutate_config(self):
+        cfg = CONFIG
+        original = dict(cfg['model'])
+        for ci in (None, 50, 300, 500):
+            new_cfg = optimize_training_config(ci, cfg)
+            self.assertIsNot(new_cfg, cfg['model'])
+        self.assertEqual(cfg['model'], original)
+
+@patch('optimization.optimizer.TORCH_AVAILABLE', True)
+@patch('optimization.optimizer._available_memory_bytes', return_value=MIN_FREE_BYTES_FOR_DOUBLING)
+class TestBatchSizeBuckets(unittest.TestCase):
+    def make_cfg(self, batch_size=100, use_mixed_precision=False):
+        return {
+            'train': {'min_carbon_intensity': 180, 'max_carbon_intensity': 400},
+            'model': {'epochs': 10, 'batch_size': batch_size,
+                      'use_mixed_precision': use_mixed_precision}
+        }
+
+    def test_low_bucket_keeps_batch_size(self, _):
+        new_cfg = optimize_training_config(100, self.make_cfg())
+        self.assertEqual(new_cfg['batch_size'], 104)  # 100 rounded up to a multiple of 8
+        self.assertFalse(new_cfg['use_mixed_precision'])
+
+    def test_moderate_bucket_scales_batch_size(self, _):
+        new_cfg = optimize_training_config(300, self.make_cfg())
+        self.assertEqual(new_cfg['batch_size'], 80)  # 75 -> 80
+        self.assertFalse(new_cfg['use_mixed_precision'])
+
+    def test_high_bucket_enables_mixed_precision(self, _):
+        # 100 * 0.5 = 50, doubled for mixed precision = 100 -> 104
+        new_cfg = optimize_training_config(500, self.make_cfg())
+        self.assertTrue(new_cfg['use_mixed_precision'])
+        self.assertEqual(new_cfg['batch_size'], 104)
+
+    def test_thresholds_are_moderate(self, _):
+        cfg = self.make_cfg()
+        self.assertEqual(optimize_training_config(180, cfg)['batch_size'], 80)
+        self.assertEqual(optimize_training_config(400, cfg)['batch_size'], 80)
+
+    def test_mixed_precision_doubling_needs_free_memory(self, mock_memory):
+        cfg = self.make_cfg(batch_size=64, use_mixed_precision=True)
+        self.assertEqual(optimize_training_config(100, cfg)['batch_size'], 128)
+        mock_memory.return_value = MIN_FREE_BYTES_FOR_DOUBLING - 1
+        self.assertEqual(optimize_training_config(100, cfg)['batch_size'], 64)
+
+    def test_no_doubling_without_torch(self, mock_memory):
+        """Test the sklearn path, which ignores mixed precision, keeps the batch size."""
+        cfg = self.make_cfg(batch_size=64, use_mixed_precision=True)
+        with patch('optimization.optimizer.TORCH_AVAILABLE', False):
+            self.assertEqual(optimize_training_config(100, cfg)['batch_size'], 64)
+        mock_memory.assert_not_called()
+
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
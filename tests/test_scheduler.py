@@ -1,10 +1,44 @@
 import unittest
+from unittest.mock import patch
 from scheduler.scheduler import schedule_training
 
+def make_cfg(earliest=0, latest=23):
+    return {
+        'carbon_api': {'region': 'TEST'},
+        'train': {'earliest_start_hour': earliest, 'latest_start_hour': latest,
+                  'min_carbon_intensity': 180, 'max_carbon_intensity': 400}
+    }
+
 class TestScheduler(unittest.TestCase):
-    def test_schedule_returns_bool(self):
-        res = schedule_training()
+    @patch('scheduler.scheduler.get_carbon_intensity', return_value=250)
+    def test_schedule_returns_bool(self, mock_get_ci):
+        res = schedule_training(make_cfg())
         self.assertIsInstance(res, bool)
 
+    @patch('scheduler.scheduler.get_carbon_intensity')
+    def test_prefetched_ci_skips_fetch(self, mock_get_ci):
+        """Test a carbon intensity passed in by the caller is not fetched again."""
+        res = schedule_training(make_cfg(), ci=100)
+        self.assertTrue(res)
+        mock_get_ci.assert_not_called()
+
+    @patch('scheduler.scheduler.load_config')
+    @patch('scheduler.scheduler.get_carbon_intensity', return_value=250)
+    def test_passed_config_is_not_reloaded(self, mock_get_ci, mock_load_config):
+        """Test a config passed in by the caller is used as-is."""
+        schedule_training(make_cfg())
+        mock_load_config.assert_not_called()
+
+    @patch('scheduler.scheduler.get_carbon_intensity', return_value=500)
+    def test_high_intensity_postpones(self, mock_get_ci):
+        self.assertFalse(schedule_training(make_cfg()))
+        mock_get_ci.assert_called_once_with('TEST')
+
+    @patch('scheduler.scheduler.get_carbon_intensity')
+    def test_outside_window_skips_fetch(self, mock_get_ci):
+        """Test no carbon intensity lookup happens outside the allowed hours."""
+        self.assertFalse(schedule_training(make_cfg(earliest=25, latest=26)))
+        mock_get_ci.assert_not_called()
+
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
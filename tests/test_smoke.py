@@ -0,0 +1,38 @@
+import unittest
+
+class TestSmoke(unittest.TestCase):
+    def test_imports(self):
+        """Test that all modules can be imported successfully."""
+        from data_pipeline.carbon_intensity import get_carbon_intensity, load_config
+        from scheduler.scheduler import schedule_training
+        from optimization.optimizer import optimize_training_config
+        from utils.logger import get_logger
+        from ml_engine.train import main
+
+    def test_config_loading(self):
+        """Test that configuration can be loaded."""
+        from data_pipeline.carbon_intensity import load_config
+        cfg = load_config()
+        self.assertIn('carbon_api', cfg)
+        self.assertIn('train', cfg)
+        self.assertIn('model', cfg)
+
+    def test_logger(self):
+        """Test that logger is working."""
+        from utils.logger import get_logger
+        logger = get_logger("Test")
+        with self.assertLogs(logger, level="INFO"):
+            logger.info("Test message")
+
+    def test_logger_level_updates_on_later_calls(self):
+        """Test a later call can change the level, including stdlib names like WARN."""
+        import logging
+        from utils.logger import get_logger
+        self.assertEqual(get_logger("LevelTest", "INFO").level, logging.INFO)
+        self.assertEqual(get_logger("LevelTest", "DEBUG").level, logging.DEBUG)
+        self.assertEqual(get_logger("LevelTest", "WARN").level, logging.WARNING)
+        self.assertEqual(get_logger("LevelTest", "NOTSET").level, logging.NOTSET)
+        self.assertEqual(len(get_logger("LevelTest").handlers), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,17 @@
+import os
+import unittest
+from unittest.mock import patch
+from ml_engine.train import _blas_threads
+
+class TestBlasThreads(unittest.TestCase):
+    def test_blas_threads_parses_omp_num_threads(self):
+        """Test OpenMP thread settings other than a bare integer don't break the import."""
+        for value, expected in (("4,2", 4), (" 3", 3)):
+            with patch.dict(os.environ, {'OMP_NUM_THREADS': value}):
+                self.assertEqual(_blas_threads(), expected)
+        with patch.dict(os.environ, {'OMP_NUM_THREADS': 'auto'}), \
+             patch('ml_engine.train.psutil.cpu_count', return_value=6):
+            self.assertEqual(_blas_threads(), 6)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Small numeric kernels for the load generator.
+Each is compiled with Numba on its first call when Numba is installed; otherwise
+it runs as its NumPy fallback where one is given, or as plain Python.
+"""
+
+import functools
+import importlib.util
+import math
+import numpy as np
+
+NUMBA_AVAILABLE = importlib.util.find_spec('numba') is not None
+
+def _jit(fallback=None, **options):
+    """
+    Compile the decorated function with numba.njit(**options) on its first call.
+
+    Numba is imported only then, so importing this module stays cheap; with
+    cache=True later processes load the machine code from disk. Without Numba,
+    fallback (if given) is used in place of the function.
+    """
+    def decorate(func):
+        impl = None
+
+        @functools.wraps(func)
+        def kernel(*args):
+            nonlocal impl
+            if impl is None:
+                if NUMBA_AVAILABLE:
+                    from numba import njit
+                    impl = njit(**options)(func)
+                else:
+                    impl = fallback or func
+            return impl(*args)
+        return kernel
+    return decorate
+
+@functools.lru_cache(maxsize=8)
+def _index_range(n):
+    arr = np.arange(n, dtype=np.float64)
+    arr.flags.writeable = False
+    return arr
+
+def _burn_numpy(n):
+    """NumPy version of burn: one C loop over a cached 0..n-1 array instead of n interpreted steps."""
+    arr = _index_range(n)
+    return float(np.dot(arr, arr) + np.sqrt(arr).sum())
+
+@_jit(fallback=_burn_numpy, cache=True, fastmath=True)
+def burn(n):
+    """Floating-point busy work for load generation: sum of i*i + sqrt(i) over i < n."""
+    s = 0.0
+    for i in range(n):
+        s += i * i + math.sqrt(i)
+    return s
+
+def _fp_load_numpy(n, offset):
+    """NumPy version of fp_load over the cached 0..n-1 array shifted by offset."""
+    x = _index_range(n) + offset
+    return float(np.dot(np.sqrt(x * 3.14159), np.sin(x)))
+
+@_jit(fallback=_fp_load_numpy, cache=True, fastmath=True)
+def fp_load(n, offset):
+    """
+    FPU-heavy busy work for stress testing: a sqrt and a sin per step.
+
+    The steps start at a non-negative, caller-supplied offset, so the sum depends on
+    runtime data and can't be folded to a constant; steps stay independent for SIMD.
+    """
+    s = 0.0
+    for i in range(n):
+        x = i + offset
+        s += math.sqrt(x * 3.14159) * math.sin(x)
+    return s
@@ -4,25 +4,73 @@ Combines energy consumption data with grid carbon intensity to calculate accurat
 """
 
 import time
-from typing import Dict, Optional, List
+from types import MappingProxyType
+from typing import Dict, Optional, List, Union
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from utils.logger import get_logger
 from utils.energy_monitor import EnergyTracker, EnergyMonitor
-from data_pipeline.carbon_intensity import get_carbon_intensity, load_config
+from data_pipeline.carbon_intensity import get_carbon_intensity, load_config, ci_cache_metrics
+import numpy as np
 
 logger = get_logger("CarbonCalculator")
 
-@dataclass
+# Electricity cost estimates (USD per kWh) by region
+ELECTRICITY_COSTS = MappingProxyType({
+    'IN-SO': 0.08,    # India South
+    'US-CA': 0.20,    # California
+    'DE': 0.30,       # Germany
+    'FR': 0.18,       # France
+    'GB': 0.25,       # UK
+    'CN': 0.08,       # China
+    'JP': 0.26,       # Japan
+    'default': 0.15   # Global average
+})
+
+# Fallback grid carbon intensity (gCO2eq/kWh) by region when the API is unavailable
+REGIONAL_AVERAGES = MappingProxyType({
+    'IN-SO': 708,     # India South (coal heavy)
+    'US-CA': 234,     # California (cleaner grid)
+    'DE': 401,        # Germany
+    'FR': 79,         # France (nuclear heavy)
+    'GB': 233,        # UK
+    'CN': 681,        # China
+    'JP': 475,        # Japan
+    'default': 475    # Global average
+})
+
+# Emission equivalents: kg CO2 per unit of each activity, and how to describe it
+EQUIVALENT_KEYS = (
+    'car_driving_miles', 'car_driving_km', 'smartphone_charges',
+    'led_bulb_hours', 'tree_absorption', 'flight_km'
+)
+EQUIVALENT_COEFFS = np.array([
+    0.404,              # Average car, kg CO2/mile
+    0.404 / 1.60934,    # Average car, kg CO2/km
+    0.0084,             # Full smartphone charge
+    0.009,              # Hour of a 10W LED bulb
+    21.8,               # Year of CO2 absorption by one tree
+    0.255               # Short-haul flight, kg CO2/km per passenger
+])
+EQUIVALENT_FORMATS = (
+    "%.2f miles of driving", "%.2f km of driving", "%.0f smartphone charges",
+    "%.1f hours of LED light bulb", "%.4f years of tree CO2 absorption",
+    "%.2f km of flight per passenger"
+)
+
+@dataclass(slots=True, frozen=True)
 class CarbonFootprint:
     """Carbon footprint calculation result."""
     total_co2_grams: float
-    total_co2_kg: float
     energy_kwh: float
     avg_carbon_intensity: float
     duration_hours: float
     cost_estimate_usd: Optional[float] = None
     
+    @property
+    def total_co2_kg(self) -> float:
+        return self.total_co2_grams / 1000.0
+    
     def __str__(self) -> str:
         return (f"Carbon Footprint: {self.total_co2_grams:.2f}g CO2 "
                 f"({self.total_co2_kg:.6f}kg) from {self.energy_kwh:.6f}kWh "
@@ -36,27 +84,13 @@ class CarbonCalculator:
         self.config = load_config()
         self.region = self.config['carbon_api']['region']
         
-        # Carbon intensity cache to avoid excessive API calls
-        self.carbon_intensity_cache = {}
-        self.cache_duration = 300  # 5 minutes
-        
-        # Electricity cost estimates (USD per kWh) by region
-        self.electricity_costs = {
-            'IN-SO': 0.08,    # India South
-            'US-CA': 0.20,    # California
-            'DE': 0.30,       # Germany
-            'FR': 0.18,       # France
-            'GB': 0.25,       # UK
-            'CN': 0.08,       # China
-            'JP': 0.26,       # Japan
-            'default': 0.15   # Global average
-        }
+        self.electricity_costs = ELECTRICITY_COSTS
         
-        logger.info(f"Carbon calculator initialized for region: {self.region}")
+        logger.info("Carbon calculator initialized for region: %s", self.region)
     
     def get_carbon_intensity_cached(self, timestamp: Optional[float] = None) -> Optional[float]:
         """
-        Get carbon intensity with caching to reduce API calls.
+        Get carbon intensity, reusing the reading cached by the data pipeline.
         
         Args:
             timestamp: Unix timestamp for historical data (not implemented yet)
@@ -64,31 +98,18 @@ class CarbonCalculator:
         Returns:
             Carbon intensity in gCO2eq/kWh or None if unavailable
         """
-        current_time = time.time()
-        
-        # Check cache
-        if (self.region in self.carbon_intensity_cache and 
-            current_time - self.carbon_intensity_cache[self.region]['timestamp'] < self.cache_duration):
-            
-            cached_value = self.carbon_intensity_cache[self.region]['value']
-            logger.debug(f"Using cached carbon intensity: {cached_value} gCO2eq/kWh")
-            return cached_value
-        
-        # Fetch new value
-        carbon_intensity = get_carbon_intensity()
-        
-        if carbon_intensity is not None:
-            # Update cache
-            self.carbon_intensity_cache[self.region] = {
-                'value': carbon_intensity,
-                'timestamp': current_time
-            }
-            logger.debug(f"Fetched carbon intensity: {carbon_intensity} gCO2eq/kWh")
-        else:
+        # get_carbon_intensity keeps the one process-wide TTL cache, so every
+        # calculator and the scheduler share the same readings
+        carbon_intensity = get_carbon_intensity(self.region)
+        if carbon_intensity is None:
             logger.warning("Could not fetch carbon intensity")
-        
         return carbon_intensity
     
+    @classmethod
+    def cache_metrics(cls) -> Dict:
+        """Hit/miss counts of the shared carbon intensity cache."""
+        return ci_cache_metrics()
+    
     def calculate_footprint(self, energy_summary: Dict, 
                           carbon_intensity: Optional[float] = None) -> CarbonFootprint:
         """
@@ -103,7 +124,7 @@ class CarbonCalculator:
         """
         if not energy_summary:
             logger.error("Empty energy summary provided")
-            return CarbonFootprint(0, 0, 0, 0, 0)
+            return CarbonFootprint(0, 0, 0, 0)
         
         # Extract energy consumption
         energy_kwh = energy_summary.get('energy', {}).get('total_kwh', 0)
@@ -111,30 +132,19 @@ class CarbonCalculator:
         
         if energy_kwh <= 0:
             logger.warning("No energy consumption recorded")
-            return CarbonFootprint(0, 0, 0, 0, duration_hours)
+            return CarbonFootprint(0, 0, 0, duration_hours)
         
         # Get carbon intensity
         if carbon_intensity is None:
             carbon_intensity = self.get_carbon_intensity_cached()
         
         if carbon_intensity is None:
-            # Fallback to regional averages (gCO2eq/kWh)
-            regional_averages = {
-                'IN-SO': 708,     # India South (coal heavy)
-                'US-CA': 234,     # California (cleaner grid)
-                'DE': 401,        # Germany
-                'FR': 79,         # France (nuclear heavy)
-                'GB': 233,        # UK
-                'CN': 681,        # China
-                'JP': 475,        # Japan
-                'default': 475    # Global average
-            }
-            carbon_intensity = regional_averages.get(self.region, regional_averages['default'])
-            logger.warning(f"Using fallback carbon intensity: {carbon_intensity} gCO2eq/kWh")
+            # Fallback to regional averages
+            carbon_intensity = REGIONAL_AVERAGES.get(self.region, REGIONAL_AVERAGES['default'])
+            logger.warning("Using fallback carbon intensity: %s gCO2eq/kWh", carbon_intensity)
         
         # Calculate carbon emissions
         total_co2_grams = energy_kwh * carbon_intensity
-        total_co2_kg = total_co2_grams / 1000
         
         # Estimate cost
         cost_per_kwh = self.electricity_costs.get(self.region, self.electricity_costs['default'])
@@ -142,50 +152,35 @@ class CarbonCalculator:
         
         footprint = CarbonFootprint(
             total_co2_grams=total_co2_grams,
-            total_co2_kg=total_co2_kg,
             energy_kwh=energy_kwh,
             avg_carbon_intensity=carbon_intensity,
             duration_hours=duration_hours,
             cost_estimate_usd=cost_estimate_usd
         )
         
-        logger.info(f"Carbon footprint calculated: {footprint}")
+        logger.info("Carbon footprint calculated: %s", footprint)
         return footprint
     
-    def calculate_equivalent_emissions(self, co2_kg: float) -> Dict[str, str]:
+    def calculate_equivalent_emissions(self, co2_kg: Union[float, np.ndarray]) -> Dict[str, Union[str, np.ndarray]]:
         """
         Calculate equivalent emissions for context.
         
         Args:
-            co2_kg: CO2 emissions in kilograms
+            co2_kg: CO2 emissions in kilograms, a scalar or an array of values
             
         Returns:
-            Dictionary with emission equivalents
+            Dictionary with emission equivalents; for array input each entry is
+            an array of strings with the same shape as co2_kg
         """
-        equivalents = {}
-        
-        # Car driving (assuming 0.404 kg CO2/mile for average car)
-        car_miles = co2_kg / 0.404
-        equivalents['car_driving_miles'] = f"{car_miles:.2f} miles of driving"
-        equivalents['car_driving_km'] = f"{car_miles * 1.60934:.2f} km of driving"
-        
-        # Smartphone charging (assuming 0.0084 kg CO2 per full charge)
-        phone_charges = co2_kg / 0.0084
-        equivalents['smartphone_charges'] = f"{phone_charges:.0f} smartphone charges"
-        
-        # LED light bulb hours (assuming 0.009 kg CO2/hour for 10W LED)
-        led_hours = co2_kg / 0.009
-        equivalents['led_bulb_hours'] = f"{led_hours:.1f} hours of LED light bulb"
-        
-        # Tree absorption (assuming 21.8 kg CO2/year per tree)
-        tree_years = co2_kg / 21.8
-        equivalents['tree_absorption'] = f"{tree_years:.4f} years of tree CO2 absorption"
-        
-        # Flight emissions (short haul ~0.255 kg CO2/km per passenger)
-        flight_km = co2_kg / 0.255
-        equivalents['flight_km'] = f"{flight_km:.2f} km of flight per passenger"
-        
-        return equivalents
+        co2 = np.asarray(co2_kg, dtype=np.float64)
+        # One broadcast division gives every equivalent for every input
+        values = np.divide(co2[..., None], EQUIVALENT_COEFFS)
+        
+        if co2.ndim == 0:
+            return {key: fmt % value
+                    for key, fmt, value in zip(EQUIVALENT_KEYS, EQUIVALENT_FORMATS, values.tolist())}
+        return {key: np.char.mod(fmt, values[..., i])
+                for i, (key, fmt) in enumerate(zip(EQUIVALENT_KEYS, EQUIVALENT_FORMATS))}
     
     def get_carbon_budget_status(self, co2_kg: float, 
                                 daily_budget_kg: Optional[float] = None) -> Dict:
@@ -239,15 +234,16 @@ class CarbonAwareTrainingSession:
         
     def __enter__(self):
         """Start the carbon-aware training session."""
-        logger.info(f"Starting carbon-aware training session: {self.session_name}")
+        logger.info("Starting carbon-aware training session: %s", self.session_name)
         self.start_time = time.time()
         
         # Check initial carbon intensity
         initial_ci = self.carbon_calculator.get_carbon_intensity_cached()
         if initial_ci:
-            logger.info(f"Initial carbon intensity: {initial_ci} gCO2eq/kWh")
+            logger.info("Initial carbon intensity: %s gCO2eq/kWh", initial_ci)
         
-        return self.energy_tracker.__enter__()
+        self.energy_tracker.__enter__()
+        return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         """End the session and calculate carbon footprint."""
@@ -259,16 +255,20 @@ class CarbonAwareTrainingSession:
         self.footprint = self.carbon_calculator.calculate_footprint(energy_summary)
         
         # Log results
-        logger.info(f"Training session '{self.session_name}' completed")
-        logger.info(f"Carbon footprint: {self.footprint}")
+        logger.info("Training session '%s' completed", self.session_name)
+        logger.info("Carbon footprint: %s", self.footprint)
         
         # Check budget
         if self.carbon_budget_kg and self.footprint.total_co2_kg > self.carbon_budget_kg:
-            logger.warning(f"Carbon budget exceeded! Used {self.footprint.total_co2_kg:.6f}kg, "
-                         f"budget was {self.carbon_budget_kg:.6f}kg")
+            logger.warning("Carbon budget exceeded! Used %.6fkg, budget was %.6fkg",
+                           self.footprint.total_co2_kg, self.carbon_budget_kg)
         
         return False
     
+    def get_realtime_stats(self) -> Dict:
+        """Get the latest energy reading of the running session."""
+        return self.energy_tracker.monitor.get_realtime_stats()
+    
     def get_carbon_footprint(self) -> Optional[CarbonFootprint]:
         """Get the calculated carbon footprint."""
         return self.footprint
@@ -284,25 +284,24 @@ if __name__ == "__main__":
     print("Testing Carbon Calculator...")
     
     # Simulate a training session
-    with CarbonAwareTrainingSession("Test Training", sampling_interval=0.5) as monitor:
+    with CarbonAwareTrainingSession("Test Training", sampling_interval=0.5) as session:
         print("Simulating training for 5 seconds...")
         
         # Simulate some work
         for i in range(5):
             time.sleep(1)
             # Simulate computation
-            _ = sum(x**2 for x in range(10000))
+            _ = np.square(np.arange(10000, dtype=np.float64)).sum()
             
-            stats = monitor.get_realtime_stats()
+            stats = session.get_realtime_stats()
             print(f"Step {i+1}: {stats.get('total_power_watts', 0):.1f}W")
     
     # Get carbon footprint
-    calculator = CarbonAwareTrainingSession("Test Training")
-    footprint = calculator.get_carbon_footprint()
+    footprint = session.get_carbon_footprint()
     if footprint:
         print(f"\nCarbon Footprint: {footprint}")
         
-        equivalents = calculator.get_equivalents()
+        equivalents = session.get_equivalents()
         print("\nEquivalent Emissions:")
         for key, value in equivalents.items():
             print(f"  {key}: {value}")
@@ -7,13 +7,36 @@ This script generates controlled CPU load to demonstrate energy monitoring on th
 import time
 import threading
 import multiprocessing
+import signal
 import sys
 import os
+import psutil
+from collections import namedtuple
+from typing import Optional
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.energy_monitor import EnergyTracker
+from utils.energy_monitor import EnergyMonitor, EnergyTracker
+from utils.logger import get_logger
+from utils._kernels import burn, fp_load
+
+logger = get_logger("LoadGenerator")
+
+# Load is generated as a duty cycle: busy for `intensity` of each period, idle for the rest
+DUTY_CYCLE_PERIOD = 0.01  # seconds
+BURN_CHUNK = 10000  # kernel iterations between clock checks
+STRESS_CHUNK = 100000  # stress kernel iterations between stop checks
+PHASE_PAUSE = 0.5  # seconds between simulated training phases
+
+_monitor = None
+
+def _shared_monitor() -> EnergyMonitor:
+    """One monitor for every demo run in this process, so GPU/TDP setup happens once."""
+    global _monitor
+    if _monitor is None:
+        _monitor = EnergyMonitor()
+    return _monitor
 
 def cpu_intensive_task(duration_seconds: int = 10, intensity: float = 0.7):
     """
@@ -23,51 +46,73 @@ def cpu_intensive_task(duration_seconds: int = 10, intensity: float = 0.7):
         duration_seconds: How long to run the task
         intensity: CPU intensity (0.0 to 1.0)
     """
+    _run_duty_cycle(duration_seconds, DUTY_CYCLE_PERIOD * intensity,
+                    DUTY_CYCLE_PERIOD * (1 - intensity))
+
+def _run_duty_cycle(duration_seconds: float, busy_seconds: float, idle_seconds: float):
+    """Alternate busy_seconds of kernel work with idle_seconds of sleep for duration_seconds."""
     end_time = time.time() + duration_seconds
-    
     while time.time() < end_time:
-        # CPU-intensive computation
-        for i in range(int(100000 * intensity)):
-            _ = i ** 2 + i ** 0.5
+        # CPU-intensive computation; the kernel is compiled, so run it for a fixed
+        # share of the period rather than a fixed iteration count
+        busy_until = time.perf_counter() + busy_seconds
+        while time.perf_counter() < busy_until:
+            burn(BURN_CHUNK)
         
         # Small break to control intensity
-        time.sleep(0.01 * (1 - intensity))
+        time.sleep(idle_seconds)
 
-def simulate_ml_training(epochs: int = 5, epoch_duration: int = 10):
+_Phase = namedtuple('_Phase', 'name intensity duration busy_seconds idle_seconds')
+
+def _phase(name: str, intensity: float, duration: int) -> _Phase:
+    return _Phase(name, intensity, duration,
+                  DUTY_CYCLE_PERIOD * intensity, DUTY_CYCLE_PERIOD * (1 - intensity))
+
+# Phases of one simulated training epoch, with their duty cycles worked out up front
+_PHASES = (
+    _phase("Data Loading", 0.3, 2),
+    _phase("Forward Pass", 0.8, 3),
+    _phase("Backward Pass", 0.9, 3),
+    _phase("Optimization", 0.6, 2),
+)
+
+def simulate_ml_training(epochs: int = 5, epoch_duration: int = 10,
+                         stop_event: Optional[threading.Event] = None):
     """
     Simulate ML training with varying CPU loads.
     
     Args:
         epochs: Number of training epochs
         epoch_duration: Duration of each epoch in seconds
+        stop_event: Set from another thread to end the simulation after the current phase
     """
+    stop = stop_event or threading.Event()
     print(f"🤖 Simulating ML Training: {epochs} epochs, {epoch_duration}s each")
     
-    with EnergyTracker(sampling_interval=0.5) as monitor:
+    # Progress inside the run goes through the (queued) logger rather than print, so
+    # writing to the terminal doesn't stall the load or the monitor thread
+    with EnergyTracker(sampling_interval=0.5, monitor=_shared_monitor()) as monitor:
         for epoch in range(epochs):
-            print(f"🔄 Epoch {epoch + 1}/{epochs}")
+            logger.info("Epoch %d/%d", epoch + 1, epochs)
             
             # Simulate different phases of training
-            phases = [
-                ("Data Loading", 0.3, 2),
-                ("Forward Pass", 0.8, 3),
-                ("Backward Pass", 0.9, 3),
-                ("Optimization", 0.6, 2)
-            ]
-            
-            for phase_name, intensity, duration in phases:
-                print(f"   {phase_name}... (intensity: {intensity:.1f})")
+            for phase in _PHASES:
+                logger.info("  %s... (intensity: %.1f)", phase.name, phase.intensity)
                 
                 # Run CPU intensive task
-                cpu_intensive_task(duration, intensity)
+                _run_duty_cycle(phase.duration, phase.busy_seconds, phase.idle_seconds)
                 
                 # Show current stats
-                stats = monitor.get_realtime_stats()
-                if stats:
-                    print(f"   💡 Power: {stats.get('total_power_watts', 0):.1f}W, "
-                          f"CPU: {stats.get('cpu_utilization', 0):.1f}%")
+                latest = monitor.latest_measurement()
+                if latest:
+                    logger.info("  Power: %.1fW, CPU: %.1f%%",
+                                latest.total_power_watts, latest.cpu_utilization)
                 
-                time.sleep(0.5)  # Brief pause between phases
+                if stop.wait(PHASE_PAUSE):  # Brief pause between phases
+                    break
+            if stop.is_set():
+                logger.info("Training simulation stopped")
+                break
     
     # Show final summary
     summary = monitor.get_summary()
@@ -77,6 +122,34 @@ def simulate_ml_training(epochs: int = 5, epoch_duration: int = 10):
         print(f"🔌 Average Power: {summary.get('power', {}).get('avg_total_watts', 0):.1f}W")
         print(f"⏱️  Duration: {summary.get('duration_seconds', 0):.1f}s")
 
+def _stress_worker(duration: int, stop_evt):
+    """Worker process body for stress_test_cpu; runs until duration elapses or stop_evt is set."""
+    # Ctrl-C is handled once by the parent, which sets stop_evt for everyone
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    end_time = time.time() + duration
+    # Seeded per worker and fed back each round, so every chunk computes something new
+    offset = float(os.getpid())
+    while not stop_evt.is_set() and time.time() < end_time:
+        # High-intensity floating-point computation (compiled when Numba is available)
+        offset = fp_load(STRESS_CHUNK, offset) % STRESS_CHUNK
+
+def _allowed_cpus() -> list:
+    """Logical CPUs this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(multiprocessing.cpu_count()))
+
+def _pin_to_cpu(pid: int, cpu: int) -> bool:
+    """Pin a process to one logical CPU; returns False where the platform can't (e.g. macOS)."""
+    try:
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(pid, {cpu})
+        else:
+            psutil.Process(pid).cpu_affinity([cpu])
+        return True
+    except (AttributeError, OSError, psutil.Error):
+        return False
+
 def stress_test_cpu(duration: int = 30):
     """
     Create high CPU load using multiple processes.
@@ -90,43 +163,48 @@ def stress_test_cpu(duration: int = 30):
     cpu_count = multiprocessing.cpu_count()
     print(f"🖥️  Using {cpu_count} CPU cores")
     
-    with EnergyTracker(sampling_interval=1.0) as monitor:
-        # Create worker processes
+    # Set to stop the workers early; Ctrl-C interrupts the progress wait immediately
+    stop_evt = multiprocessing.Event()
+    
+    with EnergyTracker(sampling_interval=1.0, monitor=_shared_monitor()) as monitor:
+        # Start worker processes (one per CPU core), each pinned to its own core so
+        # migrations don't cool its caches and the load stays even across cores
         processes = []
-        
-        def worker():
-            """Worker function for stress testing."""
-            end_time = time.time() + duration
-            while time.time() < end_time:
-                # High-intensity computation
-                for _ in range(1000000):
-                    _ = 3.14159 ** 2.71828
-        
-        # Start worker processes (one per CPU core)
+        cpus = _allowed_cpus()
         for i in range(cpu_count):
-            p = multiprocessing.Process(target=worker)
+            p = multiprocessing.Process(target=_stress_worker, args=(duration, stop_evt))
             p.start()
             processes.append(p)
-            print(f"✅ Started worker process {i+1}")
+            cpu = cpus[i % len(cpus)]
+            pinned = f" (pinned to CPU {cpu})" if _pin_to_cpu(p.pid, cpu) else ""
+            print(f"✅ Started worker process {i+1}{pinned}")
         
-        # Monitor progress
-        start_time = time.time()
-        while time.time() - start_time < duration:
-            elapsed = time.time() - start_time
-            remaining = duration - elapsed
-            
-            stats = monitor.get_realtime_stats()
-            if stats:
-                print(f"⏱️  {remaining:.0f}s remaining - "
-                      f"Power: {stats.get('total_power_watts', 0):.1f}W, "
-                      f"CPU: {stats.get('cpu_utilization', 0):.1f}%")
-            
-            time.sleep(2)
+        # Monitor progress, waking every 2 seconds or as soon as the test is stopped.
+        # The event is set here rather than in a signal handler: setting it from a
+        # handler that interrupted our own wait() would deadlock on its condition.
+        end_time = time.time() + duration
+        try:
+            while not stop_evt.is_set():
+                remaining = end_time - time.time()
+                if remaining <= 0:
+                    break
+                
+                latest = monitor.latest_measurement()
+                if latest:
+                    logger.info("%.0fs remaining - Power: %.1fW, CPU: %.1f%%", remaining,
+                                latest.total_power_watts, latest.cpu_utilization)
+                
+                stop_evt.wait(timeout=min(2.0, remaining))
+        except KeyboardInterrupt:
+            print("\n⏹️  Stress test interrupted by user")
         
         # Clean up processes
+        stop_evt.set()
         for p in processes:
-            p.terminate()
-            p.join()
+            p.join(timeout=5.0)
+            if p.is_alive():
+                p.terminate()
+                p.join()
         
         print("🛑 Stress test completed!")
     
@@ -3,29 +3,83 @@ Real-time energy monitoring for CPU and GPU during ML training.
 Tracks power consumption and provides accurate energy usage metrics.
 """
 
+import os
+import sys
+import glob
+import ctypes
+import functools
+import importlib.util
 import time
 import threading
 import psutil
 import platform
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional, List
 from dataclasses import dataclass
+import numpy as np
 from utils.logger import get_logger
 
-try:
+# GPU libraries are imported on first use by _load_gpu_libraries, and not at all on
+# hosts without an NVIDIA driver (nvidia-ml-py3 installs the pynvml module)
+GPUtil = None
+nvml = None
+GPU_AVAILABLE = False
+NVML_AVAILABLE = False
+
+logger = get_logger("EnergyMonitor")
+
+# Reading used for hosts without a monitored GPU
+NO_GPU_READING = (0.0, 0.0)
+# GPUtil reports no power, so it is estimated as load times this nominal board power
+GPUTIL_MAX_WATTS = 250.0
+
+def _nvidia_driver_present() -> bool:
+    """Cheap check for the NVML library before importing anything that would probe for it."""
+    if not sys.platform.startswith('linux'):
+        return True  # Elsewhere the GPU libraries do their own detection
+    try:
+        ctypes.CDLL('libnvidia-ml.so.1')
+        return True
+    except OSError:
+        return False
+
+@functools.lru_cache(maxsize=1)
+def _load_gpu_libraries() -> bool:
+    """Import GPUtil and pynvml if they are installed and a driver is present; True if GPUtil loaded."""
+    global GPUtil, nvml, GPU_AVAILABLE, NVML_AVAILABLE
+    if importlib.util.find_spec('GPUtil') is None:
+        logger.warning("GPUtil not available. Install with: pip install gputil")
+        return False
+    if not _nvidia_driver_present():
+        logger.info("No NVIDIA driver found; GPU monitoring disabled")
+        return False
+    
     import GPUtil
     GPU_AVAILABLE = True
-except ImportError:
-    GPU_AVAILABLE = False
+    if importlib.util.find_spec('pynvml') is not None:
+        import pynvml as nvml
+        NVML_AVAILABLE = True
+    return True
 
-try:
-    import nvidia_ml_py3 as nvml
-    NVML_AVAILABLE = True
-except ImportError:
-    NVML_AVAILABLE = False
+# Recent samples kept for measurements and the dashboard; the summary uses running
+# totals instead, so it covers the whole run whatever the size of this buffer
+SAMPLE_BUFFER_SIZE = 256
 
-logger = get_logger("EnergyMonitor")
+# Per-sample fields, stored column-wise (one contiguous row of EnergyMonitor._samples each)
+SAMPLE_FIELDS = ('timestamp', 'cpu_power_watts', 'gpu_power_watts', 'total_power_watts',
+                 'cpu_utilization', 'gpu_utilization', 'memory_usage_gb')
+
+# Shortest window a non-blocking cpu_percent() reading is taken over; shorter ones
+# are dominated by the kernel's tick granularity
+MIN_CPU_WINDOW = 0.05  # seconds
+
+# Adaptive sampling: back off by this factor after this many samples within
+# STABLE_POWER_WATTS of the previous one; any larger change snaps back to the base interval
+BACKOFF_FACTOR = 1.5
+STABLE_SAMPLES = 5
+STABLE_POWER_WATTS = 1.0
 
-@dataclass
+@dataclass(slots=True)
 class EnergyMeasurement:
     """Single energy measurement point."""
     timestamp: float
@@ -39,50 +93,86 @@ class EnergyMeasurement:
 class EnergyMonitor:
     """Real-time energy monitoring for ML training."""
     
-    def __init__(self, sampling_interval: float = 1.0):
+    def __init__(self, sampling_interval: float = 1.0, buffer_size: int = SAMPLE_BUFFER_SIZE,
+                 interval_max: Optional[float] = None, target_overhead_fraction: float = 0.01,
+                 spill_dir: Optional[str] = None):
         """
         Initialize energy monitor.
         
         Args:
-            sampling_interval: Time between measurements in seconds
+            sampling_interval: Time between measurements in seconds (the shortest
+                interval when adaptive sampling is on)
+            buffer_size: Number of recent samples kept in full
+            interval_max: Enables adaptive sampling: the interval grows up to this
+                while power is steady and resets on a change. None keeps it fixed.
+            target_overhead_fraction: With adaptive sampling, the largest share of
+                wall time the monitor thread may spend on CPU taking samples
+            spill_dir: If set, every sample is also kept on disk here, written as a
+                compressed chunk each time buffer_size new samples accumulate and when
+                monitoring stops (see load_spilled_samples)
+        
+        Raises:
+            ValueError: If an interval or the overhead fraction is out of range
         """
+        if sampling_interval <= 0:
+            raise ValueError(f"sampling_interval must be positive, got {sampling_interval}")
+        if interval_max is not None and interval_max < sampling_interval:
+            raise ValueError(f"interval_max ({interval_max}) must be at least "
+                             f"sampling_interval ({sampling_interval})")
+        if not 0 < target_overhead_fraction <= 1:
+            raise ValueError(f"target_overhead_fraction must be in (0, 1], got {target_overhead_fraction}")
         self.sampling_interval = sampling_interval
-        self.measurements: List[EnergyMeasurement] = []
+        self.interval_max = interval_max
+        self.target_overhead_fraction = target_overhead_fraction
+        # Ring buffer of samples, one row per SAMPLE_FIELDS entry; _count counts every sample written
+        self.buffer_size = buffer_size
+        self._samples = np.empty((len(SAMPLE_FIELDS), buffer_size))
+        self.spill_dir = spill_dir
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+        self.reset()
         self.monitoring = False
         self.monitor_thread: Optional[threading.Thread] = None
+        # Set by stop_monitoring; the loop waits on it, so stopping doesn't wait out an interval
+        self._stop_event = threading.Event()
         
-        # Initialize GPU monitoring
+        # Initialize GPU monitoring (NVML device handles are looked up once here)
+        self._nvml_handles = []
         self.gpu_available = self._init_gpu_monitoring()
+        # With a GPU, CPU readings run on this worker while the monitor thread queries
+        # the GPU, so the two waits overlap; without one there is nothing to overlap
+        self._cpu_sampler = (ThreadPoolExecutor(max_workers=1, thread_name_prefix="cpu-sampler")
+                             if self.gpu_available else None)
         
         # CPU power estimation coefficients (rough estimates)
         self.cpu_tdp = self._estimate_cpu_tdp()
         
-        logger.info(f"Energy monitor initialized. GPU available: {self.gpu_available}")
-        logger.info(f"Estimated CPU TDP: {self.cpu_tdp}W")
+        logger.info("Energy monitor initialized. GPU available: %s", self.gpu_available)
+        logger.info("Estimated CPU TDP: %sW", self.cpu_tdp)
     
     def _init_gpu_monitoring(self) -> bool:
         """Initialize GPU monitoring libraries."""
-        if not GPU_AVAILABLE:
-            logger.warning("GPUtil not available. Install with: pip install gputil")
+        if not _load_gpu_libraries():
             return False
             
         if NVML_AVAILABLE:
             try:
                 nvml.nvmlInit()
                 device_count = nvml.nvmlDeviceGetCount()
-                logger.info(f"NVIDIA GPU monitoring initialized. Found {device_count} GPU(s)")
+                self._nvml_handles = [nvml.nvmlDeviceGetHandleByIndex(i) for i in range(device_count)]
+                logger.info("NVIDIA GPU monitoring initialized. Found %s GPU(s)", device_count)
                 return True
             except Exception as e:
-                logger.warning(f"NVML initialization failed: {e}")
+                logger.warning("NVML initialization failed: %s", e)
         
         # Fallback to GPUtil
         try:
             gpus = GPUtil.getGPUs()
             if gpus:
-                logger.info(f"GPU monitoring via GPUtil. Found {len(gpus)} GPU(s)")
+                logger.info("GPU monitoring via GPUtil. Found %s GPU(s)", len(gpus))
                 return True
         except Exception as e:
-            logger.warning(f"GPU monitoring initialization failed: {e}")
+            logger.warning("GPU monitoring initialization failed: %s", e)
         
         return False
     
@@ -112,12 +202,13 @@ class EnergyMonitor:
             (power_watts, utilization_percent)
         """
         try:
-            cpu_percent = psutil.cpu_percent(interval=0.1)
+            # Utilization since this thread's previous call (see _prime_cpu_percent)
+            cpu_percent = psutil.cpu_percent(interval=None)
             # Power scales roughly with utilization
             estimated_power = self.cpu_tdp * (cpu_percent / 100.0)
             return estimated_power, cpu_percent
         except Exception as e:
-            logger.error(f"Error getting CPU power: {e}")
+            logger.error("Error getting CPU power: %s", e)
             return 0.0, 0.0
     
     def _get_gpu_power(self) -> tuple[float, float]:
@@ -128,48 +219,75 @@ class EnergyMonitor:
             (power_watts, utilization_percent)
         """
         if not self.gpu_available:
-            return 0.0, 0.0
+            return NO_GPU_READING
         
         try:
-            total_power = 0.0
-            total_util = 0.0
-            gpu_count = 0
-            
-            if NVML_AVAILABLE:
-                # Use NVIDIA ML for accurate power readings
-                device_count = nvml.nvmlDeviceGetCount()
-                for i in range(device_count):
-                    handle = nvml.nvmlDeviceGetHandleByIndex(i)
-                    
-                    # Get power consumption in milliwatts
-                    power_mw = nvml.nvmlDeviceGetPowerUsage(handle)
-                    power_w = power_mw / 1000.0
-                    
-                    # Get utilization
-                    util = nvml.nvmlDeviceGetUtilizationRates(handle)
-                    gpu_util = util.gpu
-                    
-                    total_power += power_w
-                    total_util += gpu_util
-                    gpu_count += 1
-                    
+            if self._nvml_handles:
+                # Use NVIDIA ML for accurate power readings (reported in milliwatts)
+                handles = self._nvml_handles
+                get_power, get_util = nvml.nvmlDeviceGetPowerUsage, nvml.nvmlDeviceGetUtilizationRates
+                total_power = sum(get_power(handle) for handle in handles) / 1000.0
+                total_util = sum(get_util(handle).gpu for handle in handles)
+                gpu_count = len(handles)
             else:
-                # Fallback to GPUtil (less accurate)
-                gpus = GPUtil.getGPUs()
-                for gpu in gpus:
-                    # GPUtil doesn't provide power, estimate based on utilization
-                    estimated_power = 250 * (gpu.load if gpu.load else 0)  # Assume 250W max
-                    total_power += estimated_power
-                    total_util += (gpu.load * 100 if gpu.load else 0)
-                    gpu_count += 1
+                # Fallback to GPUtil (less accurate). The GPU list is fetched every time:
+                # each entry is a snapshot of one nvidia-smi run, so a cached list goes stale
+                loads = [gpu.load or 0.0 for gpu in GPUtil.getGPUs()]
+                total_power = GPUTIL_MAX_WATTS * sum(loads)
+                total_util = 100.0 * sum(loads)
+                gpu_count = len(loads)
             
             avg_util = total_util / gpu_count if gpu_count > 0 else 0.0
             return total_power, avg_util
             
         except Exception as e:
-            logger.error(f"Error getting GPU power: {e}")
+            logger.error("Error getting GPU power: %s", e)
             return 0.0, 0.0
     
+    def _prime_cpu_percent(self):
+        """
+        Start psutil's utilization window on the thread that will sample the CPU.
+        
+        psutil keeps the non-blocking cpu_percent() baseline per thread, so priming
+        anywhere else leaves the first real reading at 0% (or, for a reused monitor,
+        spanning the idle time since its last run). The priming reading is discarded.
+        """
+        if self._cpu_sampler is None:
+            psutil.cpu_percent(interval=None)
+        else:
+            self._cpu_sampler.submit(psutil.cpu_percent, None).result()
+    
+    def _sample_power(self) -> tuple[float, float, float, float]:
+        """
+        Read CPU and GPU power, concurrently when a GPU is being monitored.
+        
+        Returns:
+            (cpu_power_watts, cpu_utilization, gpu_power_watts, gpu_utilization)
+        """
+        if self._cpu_sampler is None:
+            # No GPU being monitored, so skip the GPU read altogether
+            return self._get_cpu_power() + NO_GPU_READING
+        cpu_future = self._cpu_sampler.submit(self._get_cpu_power)
+        gpu = self._get_gpu_power()
+        return cpu_future.result() + gpu
+    
+    def close(self):
+        """
+        Shut down the CPU sampler thread and the NVML session.
+        
+        GPU monitoring is off afterwards: any later samples report CPU power only.
+        """
+        self.gpu_available = False
+        if self._cpu_sampler is not None:
+            self._cpu_sampler.shutdown(wait=False)
+            self._cpu_sampler = None
+        if self._nvml_handles:
+            self._nvml_handles = []
+            try:
+                nvml.nvmlShutdown()
+            except Exception as e:
+                logger.warning("NVML shutdown failed: %s", e)
+    
     def _get_memory_usage(self) -> float:
         """Get system memory usage in GB."""
         try:
@@ -178,43 +296,162 @@ class EnergyMonitor:
         except Exception:
             return 0.0
     
+    def reset(self):
+        """
+        Forget all samples and running totals.
+        
+        GPU handles and the TDP estimate are kept, so one monitor can be
+        reused across runs without paying its setup cost again.
+        """
+        self._count = 0
+        # Running sums of cpu_power..gpu_utilization and peaks of cpu/gpu/total power
+        self._sums = np.zeros(5)
+        self._peaks = np.full(3, -np.inf)
+        # Energy of cpu/gpu/total power in joules, integrated sample to sample
+        self._energy_j = np.zeros(3)
+        self._last_power = np.zeros(3)
+        self._t0 = self._t_last = 0.0
+        # Wall-clock start and stop of the monitored run; None when samples are recorded directly
+        self._t_start = self._t_end = None
+        self._dropped = 0  # sampling slots missed because a sample overran its interval
+        self._spilled = 0  # samples already written to spill_dir
+    
+    def _record(self, values):
+        """Store one sample (ordered as SAMPLE_FIELDS), overwriting the oldest once full."""
+        column = self._samples[:, self._count % self.buffer_size]
+        column[:] = values
+        power = column[1:4]
+        self._sums += column[1:6]
+        np.maximum(self._peaks, power, out=self._peaks)
+        if self._count:
+            # Trapezoidal rule, which stays correct when sample spacing varies
+            self._energy_j += (self._last_power + power) * (0.5 * (column[0] - self._t_last))
+        else:
+            self._t0 = column[0]
+            if self._t_start is not None:
+                # Nothing is known before the first reading, so it stands for the lead-in too
+                self._energy_j += power * (column[0] - self._t_start)
+        self._last_power[:] = power
+        self._t_last = column[0]
+        self._count += 1
+        # >= rather than ==, so a failed write is retried on the next sample
+        if self.spill_dir and self._count - self._spilled >= self.buffer_size:
+            self._spill()
+    
+    def _spill(self):
+        """Write samples recorded since the last spill to spill_dir as one compressed chunk."""
+        pending = self._count - self._spilled
+        if not self.spill_dir or pending <= 0:
+            return
+        # After failed writes, the oldest pending samples may already be overwritten
+        lost = max(0, pending - self.buffer_size)
+        if lost:
+            logger.warning("%d samples were overwritten before they could be written to %s",
+                           lost, self.spill_dir)
+        chunk = self._window()[:, -(pending - lost):]
+        # Named by first timestamp, so chunks sort chronologically and runs never collide
+        path = os.path.join(self.spill_dir, f"samples_{chunk[0, 0]:017.6f}.npz")
+        try:
+            np.savez_compressed(path, **dict(zip(SAMPLE_FIELDS, chunk)))
+            self._spilled = self._count
+        except OSError as e:
+            logger.error("Could not write samples to %s: %s", path, e)
+    
+    def _finish(self, stop_time: float):
+        """Close the energy integral at stop_time, holding the last reading to the end."""
+        if self._count:
+            self._energy_j += self._last_power * max(0.0, stop_time - self._t_last)
+        self._t_end = stop_time
+    
+    def _window(self) -> np.ndarray:
+        """Retained samples in time order, one row per SAMPLE_FIELDS entry."""
+        n = self._count
+        if n <= self.buffer_size:
+            return self._samples[:, :n]
+        split = n % self.buffer_size
+        return np.concatenate((self._samples[:, split:], self._samples[:, :split]), axis=1)
+    
+    @property
+    def measurements(self) -> List[EnergyMeasurement]:
+        """Retained samples as EnergyMeasurement records, built on demand."""
+        return [EnergyMeasurement(*row) for row in self._window().T.tolist()]
+    
+    def _next_interval(self, interval: float, power_delta: float, stable: int,
+                       sample_cpu_seconds: float) -> tuple[float, int]:
+        """
+        Adaptive sampling step.
+        
+        Returns:
+            (next interval, updated count of consecutive steady samples)
+        """
+        if power_delta >= STABLE_POWER_WATTS:
+            interval, stable = self.sampling_interval, 0
+        else:
+            stable += 1
+            if stable >= STABLE_SAMPLES:
+                interval *= BACKOFF_FACTOR
+        # Keep the monitor's own CPU use within budget; it draws the power being measured
+        interval = max(interval, sample_cpu_seconds / self.target_overhead_fraction)
+        return min(interval, self.interval_max), stable
+    
     def _monitor_loop(self):
         """Main monitoring loop running in separate thread."""
         logger.info("Energy monitoring started")
         
-        while self.monitoring:
+        interval = self.sampling_interval
+        stable = 0
+        last_total_power = None
+        # The first sample follows priming after only a short CPU window rather
+        # than a full interval, so short runs are still covered from the start
+        self._prime_cpu_percent()
+        self._stop_event.wait(min(MIN_CPU_WINDOW, interval))
+        # Samples are due on a fixed monotonic cadence, so time spent sampling
+        # doesn't stretch the period
+        next_due = time.monotonic()
+        
+        while True:
             try:
                 timestamp = time.time()
+                cpu_start = time.thread_time()
                 
                 # Get power measurements
-                cpu_power, cpu_util = self._get_cpu_power()
-                gpu_power, gpu_util = self._get_gpu_power()
+                cpu_power, cpu_util, gpu_power, gpu_util = self._sample_power()
                 total_power = cpu_power + gpu_power
                 memory_usage = self._get_memory_usage()
                 
-                # Create measurement
-                measurement = EnergyMeasurement(
-                    timestamp=timestamp,
-                    cpu_power_watts=cpu_power,
-                    gpu_power_watts=gpu_power,
-                    total_power_watts=total_power,
-                    cpu_utilization=cpu_util,
-                    gpu_utilization=gpu_util,
-                    memory_usage_gb=memory_usage
-                )
-                
-                self.measurements.append(measurement)
+                self._record((timestamp, cpu_power, gpu_power, total_power,
+                              cpu_util, gpu_util, memory_usage))
                 
                 # Log periodically
-                if len(self.measurements) % 10 == 0:
-                    logger.debug(f"Power: CPU={cpu_power:.1f}W, GPU={gpu_power:.1f}W, "
-                               f"Total={total_power:.1f}W, CPU%={cpu_util:.1f}, GPU%={gpu_util:.1f}")
+                if self._count % 10 == 0:
+                    logger.debug("Power: CPU=%.1fW, GPU=%.1fW, Total=%.1fW, CPU%%=%.1f, GPU%%=%.1f",
+                                 cpu_power, gpu_power, total_power, cpu_util, gpu_util)
                 
-                time.sleep(self.sampling_interval)
+                if self.interval_max is not None:
+                    delta = 0.0 if last_total_power is None else abs(total_power - last_total_power)
+                    last_total_power = total_power
+                    interval, stable = self._next_interval(
+                        interval, delta, stable, time.thread_time() - cpu_start)
                 
             except Exception as e:
-                logger.error(f"Error in monitoring loop: {e}")
-                time.sleep(self.sampling_interval)
+                logger.error("Error in monitoring loop: %s", e)
+            
+            last_sample = time.monotonic()
+            if self._stop_event.is_set():
+                break
+            
+            next_due += interval
+            delay = next_due - time.monotonic()
+            if delay > 0:
+                # Woken early by stop_monitoring: go round once more for a final sample
+                # at the stop time, unless the last one is too recent to read the CPU
+                if self._stop_event.wait(delay) and time.monotonic() - last_sample < MIN_CPU_WINDOW:
+                    break
+            else:
+                # Overran: drop the slots that passed entirely and restart the cadence
+                # from now (the sample taken next stands in for the current slot)
+                self._dropped += int(-delay // interval)
+                next_due = time.monotonic()
     
     def start_monitoring(self):
         """Start energy monitoring in background thread."""
@@ -223,7 +460,9 @@ class EnergyMonitor:
             return
         
         self.monitoring = True
-        self.measurements.clear()
+        self._stop_event.clear()
+        self.reset()
+        self._t_start = time.time()
         self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
         self.monitor_thread.start()
         logger.info("Energy monitoring started")
@@ -235,44 +474,43 @@ class EnergyMonitor:
             return {}
         
         self.monitoring = False
+        self._stop_event.set()
         if self.monitor_thread:
             self.monitor_thread.join(timeout=5.0)
+        self._finish(time.time())
+        self._spill()
         
         logger.info("Energy monitoring stopped")
         return self.get_summary()
     
     def get_summary(self) -> Dict:
-        """Get summary statistics of energy consumption."""
-        if not self.measurements:
+        """Get summary statistics of energy consumption since monitoring started."""
+        n = self._count
+        if n == 0:
             return {}
         
         # Calculate duration
-        duration_seconds = self.measurements[-1].timestamp - self.measurements[0].timestamp
+        # The whole monitored run when known, else the span of the samples
+        start = self._t0 if self._t_start is None else self._t_start
+        end = self._t_last if self._t_end is None else self._t_end
+        duration_seconds = float(end - start)
         duration_hours = duration_seconds / 3600
         
-        # Calculate average power consumption
-        avg_cpu_power = sum(m.cpu_power_watts for m in self.measurements) / len(self.measurements)
-        avg_gpu_power = sum(m.gpu_power_watts for m in self.measurements) / len(self.measurements)
-        avg_total_power = sum(m.total_power_watts for m in self.measurements) / len(self.measurements)
+        # Average power and utilization from the running sums
+        (avg_cpu_power, avg_gpu_power, avg_total_power,
+         avg_cpu_util, avg_gpu_util) = (self._sums / n).tolist()
         
-        # Calculate energy consumption (power * time)
-        total_energy_kwh = avg_total_power * duration_hours / 1000  # Convert to kWh
-        cpu_energy_kwh = avg_cpu_power * duration_hours / 1000
-        gpu_energy_kwh = avg_gpu_power * duration_hours / 1000
+        # Energy consumption, integrated over the samples (J -> kWh)
+        cpu_energy_kwh, gpu_energy_kwh, total_energy_kwh = (self._energy_j / 3.6e6).tolist()
         
         # Calculate peak power
-        peak_total_power = max(m.total_power_watts for m in self.measurements)
-        peak_cpu_power = max(m.cpu_power_watts for m in self.measurements)
-        peak_gpu_power = max(m.gpu_power_watts for m in self.measurements)
-        
-        # Average utilization
-        avg_cpu_util = sum(m.cpu_utilization for m in self.measurements) / len(self.measurements)
-        avg_gpu_util = sum(m.gpu_utilization for m in self.measurements) / len(self.measurements)
+        peak_cpu_power, peak_gpu_power, peak_total_power = self._peaks.tolist()
         
         summary = {
             'duration_seconds': duration_seconds,
             'duration_hours': duration_hours,
-            'measurements_count': len(self.measurements),
+            'measurements_count': n,
+            'dropped_samples': self._dropped,
             'energy': {
                 'total_kwh': total_energy_kwh,
                 'cpu_kwh': cpu_energy_kwh,
@@ -299,28 +537,52 @@ class EnergyMonitor:
         
         return summary
     
+    def latest_measurement(self) -> Optional[EnergyMeasurement]:
+        """Most recent sample, or None before the first one."""
+        if not self._count:
+            return None
+        return EnergyMeasurement(*self._samples[:, (self._count - 1) % self.buffer_size].tolist())
+    
     def get_realtime_stats(self) -> Dict:
         """Get current real-time statistics."""
-        if not self.measurements:
+        if not self._count:
             return {}
         
-        latest = self.measurements[-1]
-        return {
-            'timestamp': latest.timestamp,
-            'cpu_power_watts': latest.cpu_power_watts,
-            'gpu_power_watts': latest.gpu_power_watts,
-            'total_power_watts': latest.total_power_watts,
-            'cpu_utilization': latest.cpu_utilization,
-            'gpu_utilization': latest.gpu_utilization,
-            'memory_usage_gb': latest.memory_usage_gb
-        }
+        latest = self._samples[:, (self._count - 1) % self.buffer_size]
+        return dict(zip(SAMPLE_FIELDS, latest.tolist()))
+
+def load_spilled_samples(spill_dir: str) -> np.ndarray:
+    """
+    Read back every sample an EnergyMonitor wrote to spill_dir.
+    
+    Returns:
+        Array with one row per SAMPLE_FIELDS entry, in time order
+    """
+    chunks = []
+    for path in sorted(glob.glob(os.path.join(spill_dir, "samples_*.npz"))):
+        with np.load(path) as data:
+            chunks.append(np.stack([data[field] for field in SAMPLE_FIELDS]))
+    if not chunks:
+        return np.empty((len(SAMPLE_FIELDS), 0))
+    return np.concatenate(chunks, axis=1)
 
 # Context manager for easy usage
 class EnergyTracker:
     """Context manager for tracking energy during ML training."""
     
-    def __init__(self, sampling_interval: float = 1.0):
-        self.monitor = EnergyMonitor(sampling_interval)
+    def __init__(self, sampling_interval: float = 1.0, monitor: Optional[EnergyMonitor] = None):
+        """
+        Args:
+            sampling_interval: Time between measurements in seconds
+            monitor: Existing monitor to reuse (it is reset, not closed); a new
+                one is created and closed on exit when omitted
+        """
+        self._owns_monitor = monitor is None
+        if monitor is None:
+            monitor = EnergyMonitor(sampling_interval)
+        else:
+            monitor.sampling_interval = sampling_interval
+        self.monitor = monitor
         self.summary = {}
     
     def __enter__(self):
@@ -329,6 +591,8 @@ class EnergyTracker:
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.summary = self.monitor.stop_monitoring()
+        if self._owns_monitor:
+            self.monitor.close()
         return False
     
     def get_summary(self) -> Dict:
@@ -1,11 +1,29 @@
+import atexit
+import functools
 import logging
+import logging.handlers
+import queue
 
-def get_logger(name, level="INFO"):
+# Loggers only enqueue records (QueueHandler merges the message and args on the
+# calling thread); a background listener applies the formatter and writes to
+# stderr, so logging from a hot loop never waits on the terminal
+_LOG_QUEUE = queue.SimpleQueue()
+_QUEUE_HANDLER = logging.handlers.QueueHandler(_LOG_QUEUE)
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(logging.Formatter('%(asctime)s | %(levelname)s | %(name)s | %(message)s'))
+_listener = logging.handlers.QueueListener(_LOG_QUEUE, _stream_handler)
+_listener.start()
+atexit.register(_listener.stop)  # Flushes records still queued at exit
+
+@functools.lru_cache(maxsize=None)
+def _queued_logger(name):
+    """Logger for name with the shared queue handler attached; set up once per name."""
     logger = logging.getLogger(name)
-    if not logger.handlers:
-        ch = logging.StreamHandler()
-        formatter = logging.Formatter('%(asctime)s | %(levelname)s | %(name)s | %(message)s')
-        ch.setFormatter(formatter)
-        logger.addHandler(ch)
-    logger.setLevel(getattr(logging, level))
-    return logger
\ No newline at end of file
+    if _QUEUE_HANDLER not in logger.handlers:
+        logger.addHandler(_QUEUE_HANDLER)
+    return logger
+
+def get_logger(name, level="INFO"):
+    logger = _queued_logger(name)
+    logger.setLevel(level)  # Any stdlib level name or number, applied on every call
+    return logger